@@ -1,15 +1,32 @@
 import os
-import requests
+import re
+import asyncio
+import unicodedata
+import httpx
 from typing import TypedDict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
 
+from Utils.rate_limit import backoff_delay
+from Utils.ttl_cache import TTLCache
+from Utils.single_flight import SingleFlight
+from Utils.metrics import traced
+
 load_dotenv()
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
-SERPER_API_URL = "https://google.serper.dev/search"
+SERPER_API_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev/search")
+SERPER_PAGES = int(os.getenv("SERPER_PAGES", "1"))
+# "|"-separated templates, e.g. "{query}|{query} jobs|{query} hiring"
+SERPER_QUERY_VARIANTS = [v for v in os.getenv("SERPER_QUERY_VARIANTS", "{query}").split("|") if v.strip()]
+SERPER_TIMEOUT = float(os.getenv("SERPER_TIMEOUT", "10"))
+SERPER_CONNECT_TIMEOUT = float(os.getenv("SERPER_CONNECT_TIMEOUT", "3"))
+SERPER_MAX_RETRIES = int(os.getenv("SERPER_MAX_RETRIES", "2"))
+SERPER_CONCURRENCY = int(os.getenv("SERPER_CONCURRENCY", "8"))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
 app = FastAPI()
 
@@ -22,38 +39,99 @@ class JobSearchState(TypedDict):
 
 # --------- 2. Nodes ----------
 
+@traced("job_search.inject_query")
 def inject_query(state: JobSearchState):
     # Just take whatever query came from input
     query = state["query"]
     print("Search Query:", query)
     return {"query": query}
 
-def serper_search(state: JobSearchState):
-    query = state["query"]
-    all_results = []
-
-    headers = {"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"}
-
-    for page in range(1):  # keep it short, only 1 page
-        payload = {
-            "q": query,
-            "num": 10,
-            "start": page * 10,
-            "tbs": "qdr:m"
-        }
-        try:
-            response = requests.post(SERPER_API_URL, json=payload, headers=headers)
-            if response.status_code != 200:
+# One keep-alive connection pool per event loop, shared by every search
+_client = None
+_client_loop = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(SERPER_TIMEOUT, connect=SERPER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+            headers={"X-API-KEY": SERPER_API_KEY or "", "Content-Type": "application/json"},
+        )
+        _client_loop = loop
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+def normalize_url(url: str) -> str:
+    # Same posting reached through different tracking links/fragments counts once
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_")])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+def build_query_variants(query: str) -> List[str]:
+    variants = [template.format(query=query).strip() for template in SERPER_QUERY_VARIANTS]
+    return list(dict.fromkeys(v for v in variants if v))
+
+async def fetch_page(client: httpx.AsyncClient, query: str, page: int, semaphore: asyncio.Semaphore) -> List[dict]:
+    payload = {
+        "q": query,
+        "num": 10,
+        "page": page + 1,
+        "tbs": "qdr:m"
+    }
+    async with semaphore:
+        for attempt in range(SERPER_MAX_RETRIES + 1):
+            try:
+                response = await client.post(SERPER_API_URL, json=payload)
+                if response.status_code == 200:
+                    try:
+                        return response.json().get("organic", [])
+                    except ValueError as e:
+                        # A malformed body won't get better on retry
+                        print(f"Serper API returned invalid JSON for '{query}' page {page + 1}: {e!r}")
+                        return []
+                if response.status_code not in RETRYABLE_STATUS:
+                    print(f"Serper API error {response.status_code} for '{query}' page {page + 1}")
+                    return []
+                retry_after = response.headers.get("retry-after")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff_delay(attempt)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                print(f"Serper API error: {e!r}")
+                delay = backoff_delay(attempt)
+            if attempt < SERPER_MAX_RETRIES:
+                await asyncio.sleep(delay)
+    return []
+
+@traced("job_search.serper_search")
+async def serper_search(state: JobSearchState):
+    client = get_http_client()
+    semaphore = asyncio.Semaphore(SERPER_CONCURRENCY)
+    queries = build_query_variants(state["query"])
+
+    # All pages of all query variants are fetched concurrently
+    pages = await asyncio.gather(*[
+        fetch_page(client, q, page, semaphore) for q in queries for page in range(SERPER_PAGES)
+    ])
+
+    all_results, seen = [], set()
+    for organic in pages:
+        for item in organic:
+            key = normalize_url(item.get("link", ""))
+            if key and key in seen:
                 continue
-            results = response.json()
-            all_results.extend(results.get("organic", []))
-        except Exception as e:
-            print(f"Serper API error: {e}")
-            continue
+            seen.add(key)
+            all_results.append(item)
 
     # ✅ keep everything, no domain filtering
     return {"raw_results": all_results}
 
+@traced("job_search.format_results")
 def format_results(state: JobSearchState):
     jobs = []
     for item in state["raw_results"]:
@@ -95,3 +173,39 @@ graph.add_edge("format_results", END)
 
 job_search_agent = graph.compile()
 
+
+# --------- 4. Cached, coalesced entry point ----------
+# Postings go stale, so results expire; identical concurrent queries share one upstream call
+search_cache = TTLCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "2000")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "900")),
+    name="search"
+)
+search_flight = SingleFlight()
+
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize("NFKC", query or "").lower()
+    # Keep characters that matter in tech terms (c++, c#, node.js)
+    query = re.sub(r"[^\w\s+#.]", " ", query)
+    return re.sub(r"\s+", " ", query).strip(" .")
+
+async def search_jobs_cached(query: str):
+    """Returns (formatted_jobs, cache_status) where cache_status is HIT, COALESCED or MISS."""
+    key = normalize_query(query)
+    hit, jobs = search_cache.get(key)
+    if hit:
+        return jobs, "HIT"
+
+    async def run_search():
+        result = await job_search_agent.ainvoke({"query": query})
+        jobs = result.get("formatted_jobs", [])
+        # An empty result is more likely an upstream hiccup than a real answer
+        if jobs:
+            search_cache.set(key, jobs)
+        return jobs
+
+    status = "COALESCED" if search_flight.is_in_flight(key) else "MISS"
+    return await search_flight.do(key, run_search), status
+
+def search_stats() -> dict:
+    return {"cache": search_cache.stats(), "single_flight": search_flight.stats()}
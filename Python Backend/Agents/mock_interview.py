@@ -1,64 +1,91 @@
 # mock_interview.py
 import os
 import time
-import cv2
 import numpy as np
-import sounddevice as sd
-import scipy.io.wavfile as wav
-import pyttsx3
 import json
 import ast
-import librosa
-import mediapipe as mp
 import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain import PromptTemplate
-from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer, util
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../Utils')))
+# The parent directory too, so `python Agents/mock_interview.py` can import the Utils package
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from cloudinary_config import upload_to_cloudinary, cloudinary
+from Utils import model_registry
+from Utils.encoder import get_model
+from Utils.llm_gateway import get_llm
+from Utils import metrics
+from Utils import audio_analysis, video_analysis
 
+# Heavy media stacks (cv2, mediapipe, sounddevice, librosa, pyttsx3, whisper) are
+# imported inside the functions that need them, so importing this module is cheap.
 
 load_dotenv()
 
 # ---------------- Config / LLM ----------------
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
-llm = ChatGroq(model="openai/gpt-oss-120b", api_key=os.getenv("GROQ_API_KEY"))
-embeddings_model =  SentenceTransformer('all-MiniLM-L6-v2')
+llm = get_llm()
 
 # ---------------- Transcription backend selection ----------------
-_USE_FASTER_WHISPER = False
-_USE_OPENAI_WHISPER = False
-whisper_model = None
-
-try:
-    from faster_whisper import WhisperModel
-    whisper_model = WhisperModel("base", device="cpu")
-    _USE_FASTER_WHISPER = True
-    print("[INFO] Using faster-whisper for transcription.")
-except Exception:
+def _load_whisper():
     try:
-        import whisper as openai_whisper
-        whisper_model = openai_whisper.load_model("base")
-        _USE_OPENAI_WHISPER = True
-        print("[INFO] Using openai-whisper for transcription.")
+        from faster_whisper import WhisperModel
+        print("[INFO] Using faster-whisper for transcription.")
+        return "faster", WhisperModel("base", device="cpu")
     except Exception:
-        whisper_model = None
-        print("[WARN] No whisper backend available.")
+        try:
+            import whisper as openai_whisper
+            print("[INFO] Using openai-whisper for transcription.")
+            return "openai", openai_whisper.load_model("base")
+        except Exception:
+            print("[WARN] No whisper backend available.")
+            return "none", None
+
+model_registry.register("whisper", _load_whisper)
 
 # ---------------- Settings ----------------
 MAX_QUESTIONS = 5
 SILENCE_DURATION = 30
 NEXT_QUESTION_SILENCE = 15
 fs = 44100
-answer_output_dir = "answers"
-os.makedirs(answer_output_dir, exist_ok=True)
+answer_output_dir = "answers"  # created by run_mock_interview, not on import
+
+# ---------------- Thread pools ----------------
+# Model answers are generated concurrently, and each analysis stage has its own
+# small pool, so recording question i+1 overlaps with the analysis of question i
+# and a slow stage only queues work of its own kind. Like the models in
+# Utils/model_registry.py, the pools are created on first use: importing this
+# module (app.py does) starts no threads. app.py shuts them down on exit.
+ANSWER_WORKERS = int(os.getenv("ANSWER_WORKERS", "8"))
+STAGE_WORKERS = {"transcribe": 1, "video": 1, "audio": 1, "upload": 2, "join": 1}
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(name: str) -> ThreadPoolExecutor:
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                if name == "answer":
+                    workers = ANSWER_WORKERS
+                else:
+                    workers = int(os.getenv(f"INTERVIEW_{name.upper()}_WORKERS", str(STAGE_WORKERS[name])))
+                pool = _pools[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"interview-{name}")
+    return pool
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 # ---------------- Prompt templates ----------------
 question_prompt_template = PromptTemplate.from_template("""
@@ -93,28 +120,103 @@ def json_safe(obj):
     return obj
 
 # ---------------- Question generation ----------------
-def generate_questions_and_answers(job_desc: str, n: int = 5) -> List[Dict[str, str]]:
+# Model answers are generated concurrently, each one starting as soon as its
+# question has been streamed out of the question call.
+
+def parse_streamed_questions(buffer: str, start: int = 0):
+    """
+    Scans `buffer` from `start` for complete quoted items of the question list.
+    Returns (questions, resume_offset); an item still being streamed is left
+    for the next call. The offset is None once the closing bracket is reached,
+    so text after the list is never read as questions.
+    """
+    if start == 0:
+        start = buffer.find("[")
+        if start < 0:
+            return [], 0
+        start += 1
+    questions, i = [], start
+    while i < len(buffer):
+        quote = buffer[i]
+        if quote == "]":
+            return questions, None
+        if quote not in "\"'":
+            i += 1
+            continue
+        j = i + 1
+        while j < len(buffer) and buffer[j] != quote:
+            j += 2 if buffer[j] == "\\" else 1
+        if j >= len(buffer):
+            break
+        try:
+            questions.append(str(ast.literal_eval(buffer[i:j + 1])).strip())
+        except Exception:
+            pass
+        i = j + 1
+    return questions, i
+
+def stream_questions(job_desc: str, n: int = 5):
+    """Yields questions one by one while the LLM is still writing the list."""
     prompt = question_prompt_template.format(job_desc=job_desc, n=n)
-    response = llm.invoke([HumanMessage(content=prompt)])
-    print("[DEBUG] Raw LLM Output:", response.content)
-    text = response.content.strip()
-    try:
-        start = text.find("[")
-        list_text = text[start:]
-        questions = ast.literal_eval(list_text)
-    except Exception:
-        questions = [f"Question {i+1}" for i in range(n)]
+    buffer, offset, emitted = "", 0, 0
+    for chunk in llm.stream([HumanMessage(content=prompt)]):
+        buffer += chunk.content or ""
+        questions, offset = parse_streamed_questions(buffer, offset)
+        for q in questions:
+            if emitted < n and q:
+                emitted += 1
+                yield q
+        if offset is None:
+            break
+
+    if emitted == 0:
+        try:
+            text = buffer.strip()
+            questions = ast.literal_eval(text[text.find("["):])
+        except Exception:
+            questions = [f"Question {i+1}" for i in range(n)]
+        yield from [str(q) for q in questions][:n]
+
+@metrics.traced("interview.generate_model_answer")
+def generate_model_answer(question: str) -> str:
+    ans_prompt = answer_prompt_template.format(question=question)
+    return llm.invoke([HumanMessage(content=ans_prompt)]).content.strip()
+
+def stream_questions_and_answers(job_desc: str, n: int = 5):
+    """Yields (question, Future[model_answer]) pairs as soon as each question is ready."""
+    for q in stream_questions(job_desc, n):
+        yield q, get_pool("answer").submit(generate_model_answer, q)
+
+def prefetch_questions_and_answers(job_desc: str, n: int = 5):
+    """
+    Like stream_questions_and_answers, but a background thread drains the question
+    stream, so every model answer starts right away and the LLM stream is not held
+    open while the caller spends minutes recording an answer between items.
+    """
+    pairs: queue.Queue = queue.Queue()
+
+    def drain():
+        try:
+            for pair in stream_questions_and_answers(job_desc, n):
+                pairs.put(pair)
+        except Exception as e:
+            pairs.put(e)
+        finally:
+            pairs.put(None)
+
+    threading.Thread(target=drain, name="interview-questions", daemon=True).start()
+    while (item := pairs.get()) is not None:
+        if isinstance(item, Exception):
+            raise item
+        yield item
 
-    qa_list = []
-    for q in questions:
-        ans_prompt = answer_prompt_template.format(question=q)
-        ans_resp = llm.invoke([HumanMessage(content=ans_prompt)])
-        model_answer = ans_resp.content.strip()
-        qa_list.append({"question": q, "model_answer": model_answer})
-    return qa_list
+def generate_questions_and_answers(job_desc: str, n: int = 5) -> List[Dict[str, str]]:
+    pairs = list(stream_questions_and_answers(job_desc, n))
+    return [{"question": q, "model_answer": future.result()} for q, future in pairs]
 
 # ---------------- TTS ----------------
 def speak(text: str):
+    import pyttsx3
     engine = pyttsx3.init()
     engine.say(text)
     engine.runAndWait()
@@ -124,6 +226,10 @@ def record_av_until_silence(base: str,
                             threshold: float = 0.01,
                             silence_sec: float = SILENCE_DURATION,
                             next_q_silence: float = NEXT_QUESTION_SILENCE):
+    import cv2
+    import sounddevice as sd
+    import scipy.io.wavfile as wav
+
     audio_file = f"{base}_audio.wav"
     video_file = f"{base}_video.avi"
 
@@ -185,17 +291,18 @@ def record_av_until_silence(base: str,
         audio_array = audio_array / max_abs
     int16_audio = np.int16(np.clip(audio_array, -1.0, 1.0) * 32767)
     wav.write(audio_file, fs, int16_audio)
-    return audio_file, video_file
+    # The normalized samples are handed to the audio analysis, which then skips re-reading the WAV
+    return audio_file, video_file, audio_array
 
 # ---------------- Transcription ----------------
 def transcribe_audio_whisper(path: str) -> str:
-    global whisper_model, _USE_FASTER_WHISPER, _USE_OPENAI_WHISPER
-    if _USE_FASTER_WHISPER and whisper_model:
+    backend, whisper_model = model_registry.get("whisper")
+    if backend == "faster" and whisper_model:
         try:
             segments, _ = whisper_model.transcribe(path)
             return " ".join([seg.text for seg in segments]).strip()
         except: return ""
-    elif _USE_OPENAI_WHISPER and whisper_model:
+    elif backend == "openai" and whisper_model:
         try:
             result = whisper_model.transcribe(path)
             return result.get("text", "").strip()
@@ -203,54 +310,20 @@ def transcribe_audio_whisper(path: str) -> str:
     return ""
 
 # ---------------- Video analysis ----------------
-mp_face = mp.solutions.face_mesh
 def analyze_video(path: str) -> Dict[str, float]:
-    cap = cv2.VideoCapture(path)
-    face_mesh = mp_face.FaceMesh(static_image_mode=False, max_num_faces=1)
-    eye_scores, smile_scores = [], []
-
-    while True:
-        ret, frame = cap.read()
-        if not ret: break
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
-        if results.multi_face_landmarks:
-            lm = results.multi_face_landmarks[0]
-            left_eye = [lm.landmark[i] for i in (33, 133)]
-            right_eye = [lm.landmark[i] for i in (362, 263)]
-            left_ratio = abs(left_eye[0].x - left_eye[1].x)
-            right_ratio = abs(right_eye[0].x - right_eye[1].x)
-            eye_scores.append(max(0.0, 1.0 - (left_ratio + right_ratio) / 0.2))
-            mouth = [lm.landmark[i] for i in (61, 291)]
-            smile_scores.append(abs(mouth[0].x - mouth[1].x)*10.0)
-    cap.release()
-    face_mesh.close()
-    eye = float(np.clip(np.mean(eye_scores) if eye_scores else 0.0, 0.0, 1.0))
-    smile = float(np.clip(np.mean(smile_scores) if smile_scores else 0.0, 0.0, 1.0))
-    confidence = float(np.clip((eye + smile)/2.0,0.0,1.0))
-    return {"eye_contact_ratio": round(eye,2),"facial_expression_score": round(smile,2),"confidence_score": round(confidence,2)}
+    # Frame-sampled, downscaled FaceMesh pass (see Utils/video_analysis.py for the knobs)
+    return video_analysis.analyze_video(path)
 
 # ---------------- Audio analysis ----------------
-def analyze_audio(path: str) -> Dict[str, float]:
-    y, sr = librosa.load(path, sr=fs)
-    rms = librosa.feature.rms(y=y)[0]
-    energy = float(np.mean(rms)) if rms.size > 0 else 0.0
-    silence_ratio = float(np.sum(rms<0.01)/len(rms)) if rms.size>0 else 1.0
-    try:
-        f0, _, _ = librosa.pyin(y, fmin=75, fmax=400)
-        pitch = float(np.nanmean(f0)) if f0 is not None and not np.all(np.isnan(f0)) else 0.0
-    except:
-        pitch = 0.0
-    zcr = librosa.feature.zero_crossing_rate(y=y)[0]
-    speaking_rate_bpm = float(np.mean(zcr)*60.0*sr/512.0)
-    return {"average_energy": round(energy,4),"pitch_estimate": round(pitch,2),
-            "silence_ratio": round(silence_ratio,4),"speaking_rate_bpm": round(speaking_rate_bpm,2)}
+def analyze_audio(path: str, samples: Optional[np.ndarray] = None) -> Dict[str, float]:
+    # AUDIO_ANALYSIS_MODE=fast (default) or librosa, see Utils/audio_analysis.py
+    return audio_analysis.analyze_audio(path, samples=samples, sr=fs)
 
 # ---------------- Similarity scoring ----------------
 def compute_answer_similarity(candidate_answer: str, model_answer: str) -> float:
-    candidate_vec = embeddings_model.encode(candidate_answer, convert_to_tensor=True)
-    model_vec = embeddings_model.encode(model_answer, convert_to_tensor=True)
-    return float(util.pytorch_cos_sim(candidate_vec, model_vec))
+    # Works with either encoder backend (torch or ONNX), both return normalized vectors
+    candidate_vec, model_vec = get_model().encode([candidate_answer, model_answer], normalize_embeddings=True)
+    return float(np.dot(candidate_vec, model_vec))
 
 
 # ---------------- Final scoring with answer ----------------
@@ -272,46 +345,111 @@ def compute_final_score_with_answer(similarity_score: float, video: Dict[str,flo
             "audio_video_score": round(audio_video_score,2),
             "final_score": round(final_score,2)}
 
+# ---------------- Analysis pipeline ----------------
+# Used when a stage fails, so one bad question is scored as unanswered instead of aborting the run
+STAGE_DEFAULTS = {
+    "transcript": "",
+    "video": {"eye_contact_ratio": 0.0, "facial_expression_score": 0.0, "confidence_score": 0.0},
+    "audio": {"average_energy": 0.0, "silence_ratio": 1.0, "speaking_rate_bpm": 0.0},
+    "audio_url": None,
+    "video_url": None,
+}
+
+def timed(timings: Dict[str, float], stage: str, fn, *args):
+    started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = round(time.perf_counter() - started, 3)
+        metrics.record_span(f"interview.{stage}", time.perf_counter() - started, time.thread_time() - cpu_started)
+
+def submit_analysis(audio_path: str, video_path: str, audio_samples: Optional[np.ndarray],
+                    timings: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "transcript": get_pool("transcribe").submit(timed, timings, "transcribe", transcribe_audio_whisper, audio_path),
+        "video": get_pool("video").submit(timed, timings, "video", analyze_video, video_path),
+        "audio": get_pool("audio").submit(timed, timings, "audio", analyze_audio, audio_path, audio_samples),
+        "audio_url": get_pool("upload").submit(timed, timings, "upload_audio", upload_to_cloudinary, audio_path),
+        "video_url": get_pool("upload").submit(timed, timings, "upload_video", upload_to_cloudinary, video_path),
+    }
+
+def stage_result(q: str, stage: str, future, errors: Dict[str, str]):
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"[WARN] {stage} failed for question {q!r}: {e}")
+        errors[stage] = str(e)
+        return STAGE_DEFAULTS.get(stage)
+
+def join_analysis(q: str, model_ans_future, pending: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+    errors: Dict[str, str] = {}
+    candidate_answer = (stage_result(q, "transcript", pending["transcript"], errors) or "").strip()
+    model_ans = timed(timings, "wait_model_answer", stage_result, q, "model_answer", model_ans_future, errors) or ""
+    similarity_score = timed(timings, "similarity", compute_answer_similarity, candidate_answer, model_ans) if candidate_answer and model_ans else 0.0
+    video_results = stage_result(q, "video", pending["video"], errors)
+    audio_results = stage_result(q, "audio", pending["audio"], errors)
+    final_scores = compute_final_score_with_answer(similarity_score, video_results, audio_results)
+
+    result = {
+        "question": q,
+        "model_answer": model_ans,
+        "candidate_answer": candidate_answer,
+        "similarity_score": similarity_score,
+        "video_analysis": video_results,
+        "audio_analysis": audio_results,
+        "final_scores": final_scores,
+        "audio_url": stage_result(q, "audio_url", pending["audio_url"], errors),
+        "video_url": stage_result(q, "video_url", pending["video_url"], errors),
+        "timings": timings,
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+def summarize_timings(qa_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals: Dict[str, float] = {}
+    for r in qa_results:
+        for stage, seconds in r.get("timings", {}).items():
+            totals[stage] = round(totals.get(stage, 0.0) + seconds, 3)
+    # Recording is paced by the candidate, so it is never the bottleneck we can fix
+    analysis = {k: v for k, v in totals.items() if k not in ("speak", "record")}
+    return {"totals": totals, "bottleneck": max(analysis, key=analysis.get) if analysis else None}
+
 # ---------------- Main interview flow ----------------
 def run_mock_interview(job_description: str):
     job_desc = job_description.strip()
     if not job_desc:
         raise ValueError("Job description cannot be empty.")
 
-    qa_list = generate_questions_and_answers(job_desc, MAX_QUESTIONS)
-    qa_results = []
-
-    for i, qa in enumerate(qa_list, start=1):
-        q, model_ans = qa["question"], qa["model_answer"]
+    os.makedirs(answer_output_dir, exist_ok=True)
+    started = time.perf_counter()
+    joins = []
+    completed: Dict[int, Dict[str, Any]] = {}
+    completed_lock = threading.Lock()
+    partial_path = os.path.join(answer_output_dir, "qa_results_partial.json")
+
+    def join_and_save(index: int, *args) -> Dict[str, Any]:
+        # Saved as each question's analysis finishes, so a crash mid-interview keeps every finished
+        # answer; saving inside the job (not in a done callback) means join.result() implies saved
+        result = join_analysis(*args)
+        with completed_lock:
+            completed[index] = result
+            with open(partial_path, "w", encoding="utf-8") as pf:
+                json.dump([completed[k] for k in sorted(completed)], pf, indent=2, default=json_safe)
+        return result
+
+    # The first question is asked while the rest of the list and the model answers are still being generated
+    for i, (q, model_ans_future) in enumerate(prefetch_questions_and_answers(job_desc, MAX_QUESTIONS), start=1):
         print(f"\n=== Question {i} ===\n{q}")
-        speak(q)
+        timings: Dict[str, float] = {}
+        timed(timings, "speak", speak, q)
         base = os.path.join(answer_output_dir, f"q{i}")
-        audio_path, video_path = record_av_until_silence(base)
-        candidate_answer = transcribe_audio_whisper(audio_path).strip()
-        if not candidate_answer: candidate_answer = ""
-        video_results = analyze_video(video_path)
-        audio_results = analyze_audio(audio_path)
-        similarity_score = compute_answer_similarity(candidate_answer, model_ans) if candidate_answer else 0.0
-        final_scores = compute_final_score_with_answer(similarity_score, video_results, audio_results)
-
-        # Upload to Cloudinary
-        audio_url = upload_to_cloudinary(audio_path)
-        video_url = upload_to_cloudinary(video_path)
-
-        qa_results.append({
-            "question": q,
-            "model_answer": model_ans,
-            "candidate_answer": candidate_answer,
-            "similarity_score": similarity_score,
-            "video_analysis": video_results,
-            "audio_analysis": audio_results,
-            "final_scores": final_scores,
-            "audio_url": audio_url,
-            "video_url": video_url
-        })
-
-        with open(os.path.join(answer_output_dir, "qa_results_partial.json"), "w", encoding="utf-8") as pf:
-            json.dump(qa_results, pf, indent=2, default=json_safe)
+        audio_path, video_path, audio_samples = timed(timings, "record", record_av_until_silence, base)
+        # Analysis runs in the background while the next question is asked
+        pending = submit_analysis(audio_path, video_path, audio_samples, timings)
+        joins.append(get_pool("join").submit(join_and_save, i, q, model_ans_future, pending, timings))
+
+    qa_results = [join.result() for join in joins]
 
     # Compute overall scores as before...
     answered = [r for r in qa_results if r.get("candidate_answer")]
@@ -325,7 +463,9 @@ def run_mock_interview(job_description: str):
         {"average_energy": avg_audio_energy, "silence_ratio":0.2, "speaking_rate_bpm":100.0}
     )
 
-    out = {"qa_results": qa_results, "final_overall": final_overall}
+    stage_timings = summarize_timings(qa_results)
+    stage_timings["pipeline_seconds"] = round(time.perf_counter() - started, 3)
+    out = {"qa_results": qa_results, "final_overall": final_overall, "stage_timings": stage_timings}
     out_path = os.path.join(answer_output_dir, "qa_results.json")
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(out, f, indent=2, default=json_safe)
@@ -1,73 +1,119 @@
 import os
+import io
+import sys
 import json
+import hashlib
+import tempfile
 import fitz  # PyMuPDF
 from docx import Document
 from typing import TypedDict
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
 from langgraph.graph import StateGraph, END
 
 
 from dotenv import load_dotenv
 load_dotenv()
 
+# Lets `python Agents/resume_agent.py` find the shared Utils package
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Utils.ttl_cache import TTLCache
+from Utils.llm_gateway import get_llm
+from Utils.metrics import traced
+
 # --------- 1. Resume parsing utilities ----------
-def extract_text_from_pdf(path):
-    try:
-        doc = fitz.open(path)
-        return "\n".join([page.get_text() for page in doc])
-    except Exception as e:
-        print(f"Failed to read PDF {path}: {e}")
-        return None
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "30"))
+OCR_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_MIN_IMAGE_COVERAGE", "0.1"))
+
+
+def page_needs_ocr(page_stats):
+    # A page with a real text layer never needs OCR, even if it carries a logo
+    return (page_stats["text_chars"] < OCR_MIN_PAGE_CHARS
+            and page_stats["image_coverage"] >= OCR_MIN_IMAGE_COVERAGE)
 
 
-def contains_image(pdf_path):
+def open_pdf(source):
+    # `source` is either a path or the raw file bytes (parsed in memory, no temp file)
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def analyze_pdf(source):
+    """
+    Opens the PDF once and returns, per page, its text layer plus image count
+    and image coverage. Pages that need OCR also carry a single-page PDF copy.
+    """
+    pages = []
     try:
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            if page.get_images(full=True):
-                return True
-        return False
+        with open_pdf(source) as doc:
+            for page in doc:
+                text = page.get_text()
+                page_area = abs(page.rect) or 1.0
+                images = page.get_image_info()
+                image_area = sum(abs(fitz.Rect(img["bbox"]) & page.rect) for img in images)
+                stats = {
+                    "number": page.number,
+                    "text": text,
+                    "text_chars": len(text.strip()),
+                    "image_count": len(images),
+                    "image_coverage": round(min(1.0, image_area / page_area), 4),
+                }
+                if page_needs_ocr(stats):
+                    with fitz.open() as single:
+                        single.insert_pdf(doc, from_page=page.number, to_page=page.number)
+                        stats["pdf_bytes"] = single.tobytes()
+                pages.append(stats)
     except Exception as e:
-        print(f"Failed to check images in {pdf_path}: {e}")
-        return False
+        print(f"Failed to read PDF {describe_source(source)}: {e}")
+    return pages
 
 
-def image_resume_parsing(pdf_path):
+@traced("resume.ocr_page")
+def ocr_pdf_page(pdf_bytes):
+    # hi_res OCR is the one path that still spills to disk, one page at a time
     from unstructured.partition.pdf import partition_pdf
-    elements = partition_pdf(
-        filename=pdf_path,
-        extract_images_in_pdf=True,
-        ocr_languages="eng",
-        strategy="hi_res"
-    )
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        tmp.write(pdf_bytes)
+        tmp.flush()
+        elements = partition_pdf(filename=tmp.name, ocr_languages="eng", strategy="hi_res")
     return "\n".join([str(el) for el in elements])
 
 
-def extract_text_from_docx(path):
+def merge_page_text(pages, ocr_texts):
+    # Pages in order, with the OCR output (one per scanned page) replacing the empty text layers
+    ocr_text = dict(zip((p["number"] for p in pages if "pdf_bytes" in p), ocr_texts))
+    return "\n".join(ocr_text.get(p["number"], p["text"]) for p in pages)
+
+
+def extract_text_from_docx(source):
     try:
-        doc = Document(path)
+        doc = Document(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
         return "\n".join([p.text for p in doc.paragraphs])
     except Exception as e:
-        print(f"Failed to read DOCX {path}: {e}")
+        print(f"Failed to read DOCX {describe_source(source)}: {e}")
         return None
 
 
+def describe_source(source):
+    return f"<{len(source)} bytes>" if isinstance(source, (bytes, bytearray)) else source
+
+
 # --------- 2. LangGraph State ----------
 class ResumeState(TypedDict):
     resume_file_path: str
+    resume_filename: str
+    resume_bytes: bytes
     file_type: str
+    pdf_pages: list
     resume_text: str
     structured_output: dict
 
 
 # --------- 3. LLM Setup ----------
-llm = ChatGroq(
-    model_name="openai/gpt-oss-120b",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+# Shared gateway: one pooled client, rate limits, retries and circuit breaker for every agent
+llm = get_llm()
 
 prompt_template = PromptTemplate.from_template("""
 You are an expert at extracting structured JSON from resumes.
@@ -97,37 +143,56 @@ parser = StrOutputParser()
 
 
 # --------- 4. Define Graph Nodes ----------
+def resume_source(state: ResumeState):
+    # In-memory upload bytes take precedence over a path on disk
+    if state.get("resume_bytes") is not None:
+        return state["resume_bytes"]
+    return state["resume_file_path"]
+
+
+@traced("resume.detect_file_type")
 def detect_file_type(state: ResumeState):
-    path = state["resume_file_path"]
-    if path.endswith(".pdf"):
-        if contains_image(path):
-            return {"file_type": "image_pdf"}
-        return {"file_type": "text_pdf"}
-    elif path.endswith(".docx"):
+    # Text already extracted upstream (e.g. in a worker process): go straight to the LLM
+    if state.get("resume_text"):
+        return {"file_type": "preparsed"}
+    name = (state.get("resume_filename") or state.get("resume_file_path") or "").lower()
+    if name.endswith(".pdf"):
+        pages = analyze_pdf(resume_source(state))
+        if any("pdf_bytes" in p for p in pages):
+            return {"file_type": "image_pdf", "pdf_pages": pages}
+        return {"file_type": "text_pdf", "pdf_pages": pages}
+    elif name.endswith(".docx"):
         return {"file_type": "docx"}
     else:
         return {"file_type": "unsupported"}
 
 
+@traced("resume.parse_text_pdf")
 def parse_text_pdf(state: ResumeState):
-    text = extract_text_from_pdf(state["resume_file_path"])
-    return {"resume_text": text or ""}
+    text = "\n".join(p["text"] for p in state.get("pdf_pages", []))
+    return {"resume_text": text}
 
 
+@traced("resume.parse_image_pdf")
 def parse_image_pdf(state: ResumeState):
-    text = image_resume_parsing(state["resume_file_path"])
-    return {"resume_text": text or ""}
+    # OCR only the pages without a text layer; the API instead fans them out over cpu_pool
+    pages = state.get("pdf_pages", [])
+    ocr_texts = [ocr_pdf_page(p["pdf_bytes"]) for p in pages if "pdf_bytes" in p]
+    return {"resume_text": merge_page_text(pages, ocr_texts)}
 
 
+@traced("resume.parse_docx_file")
 def parse_docx_file(state: ResumeState):
-    text = extract_text_from_docx(state["resume_file_path"])
+    text = extract_text_from_docx(resume_source(state))
     return {"resume_text": text or ""}
 
 
+@traced("resume.handle_unsupported")
 def handle_unsupported(state: ResumeState):
     return {"structured_output": {"error": "Unsupported file type"}}
 
 
+@traced("resume.extract_structured_json")
 def extract_structured_json(state: ResumeState):
     if not state.get("resume_text"):
         return {"structured_output": {"error": "No resume text"}}
@@ -164,7 +229,8 @@ graph.add_conditional_edges(
         "text_pdf": "parse_text_pdf",
         "image_pdf": "parse_image_pdf",
         "docx": "parse_docx_file",
-        "unsupported": "handle_unsupported"
+        "unsupported": "handle_unsupported",
+        "preparsed": "extract_structured_json"
     },
 )
 
@@ -178,7 +244,55 @@ graph.add_edge("extract_structured_json", END)
 resume_agent = graph.compile()
 
 
-# --------- 6. Usage ----------
+# --------- 6. CPU-bound stage outside the graph ----------
+PARSERS = {
+    "text_pdf": parse_text_pdf,
+    "image_pdf": parse_image_pdf,
+    "docx": parse_docx_file,
+}
+
+def parse_resume_file(source, filename: str = None, defer_ocr: bool = False) -> dict:
+    """
+    Runs file-type detection and text extraction only (no LLM), so the API can
+    execute it in a worker process and feed the result back into resume_agent.
+    `source` is a path, or the file bytes together with the original filename.
+    With `defer_ocr`, a scanned PDF comes back with its `pdf_pages` un-OCRed so
+    the caller can OCR the pages on its own pool (see merge_page_text).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        state = {"resume_bytes": bytes(source), "resume_filename": filename or ""}
+    else:
+        state = {"resume_file_path": source}
+    state.update(detect_file_type(state))
+    if defer_ocr and state["file_type"] == "image_pdf":
+        state.pop("resume_bytes", None)
+        return state
+    parser_node = PARSERS.get(state["file_type"])
+    if parser_node:
+        state.update(parser_node(state))
+    # Page payloads and the upload itself are only needed inside this process
+    state.pop("pdf_pages", None)
+    state.pop("resume_bytes", None)
+    return state
+
+
+# --------- 7. Content-hash caches ----------
+# Extracted text depends only on the file bytes; the structured JSON also depends
+# on the extraction prompt, so a prompt change re-runs the LLM stage but not OCR.
+PROMPT_VERSION = hashlib.sha256(prompt_template.template.encode("utf-8")).hexdigest()[:12]
+
+text_cache = TTLCache(max_entries=int(os.getenv("RESUME_TEXT_CACHE_SIZE", "2000")), name="resume_text")
+structured_cache = TTLCache(
+    max_entries=int(os.getenv("RESUME_STRUCTURED_CACHE_SIZE", "2000")),
+    ttl=float(os.getenv("RESUME_STRUCTURED_CACHE_TTL", "0")) or None,
+    name="resume_structured"
+)
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# --------- 8. Usage ----------
 if __name__ == "__main__":
     result = resume_agent.invoke({"resume_file_path": "../Resumes/Ajay_Pawar_5year_ sr Angular developer .docx"})
     print(json.dumps(result["structured_output"], indent=2))
@@ -1,17 +1,20 @@
 import os
 import json
+import hashlib
+from typing import Optional
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
 from langchain.tools import tool
 from .resume_agent import resume_agent
+from Utils.history_store import HistoryStore
+from Utils.embedding_cache import normalize_text
+from Utils.ttl_cache import TTLCache
+from Utils.llm_gateway import get_llm
+from Utils.metrics import traced
 
 # === LLM Setup ===
-llm = ChatGroq(
-    model_name="openai/gpt-oss-120b",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+llm = get_llm()
 
 # === Prompt Template ===
 prompt_template = PromptTemplate.from_template("""
@@ -23,7 +26,7 @@ Resume text:
 Job description:
 {job_description}
 
-Here are 1–3 past candidate evaluations for similar roles:
+Here are past candidate evaluations for the most similar roles (may be empty):
 {previous_results}
 
 Evaluate the current resume based on the following criteria:
@@ -56,32 +59,64 @@ Respond ONLY in JSON:
 """)
 
 # === History Helpers ===
-HISTORY_FILE = "resume_history.json"
+HISTORY_FILE = "resume_history.json"  # legacy format, imported once into the SQLite store
+HISTORY_DB = os.getenv("RESUME_HISTORY_DB", "resume_history.db")
+
+history_store = HistoryStore(
+    HISTORY_DB,
+    max_rows=int(os.getenv("RESUME_HISTORY_MAX_ROWS", "10000")),
+    max_age_days=float(os.getenv("RESUME_HISTORY_MAX_AGE_DAYS", "0")),
+    legacy_json=HISTORY_FILE
+)
+
+FEW_SHOT_K = int(os.getenv("FEW_SHOT_K", "3"))
+FEW_SHOT_TOKEN_BUDGET = int(os.getenv("FEW_SHOT_TOKEN_BUDGET", "600"))
+FEW_SHOT_MIN_SIMILARITY = float(os.getenv("FEW_SHOT_MIN_SIMILARITY", "0.3"))
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting prompt sections
+    return len(text) // 4 + 1
+
+def compact_example(record: dict) -> dict:
+    result = record.get("result", {})
+    return {
+        "job_description_snippet": record.get("job_description_snippet", "")[:200],
+        "resume_snippet": record.get("resume_snippet", "")[:300],
+        "scores": result.get("scores", {}),
+        "total_score": result.get("total_score")
+    }
+
+def fit_to_budget(records, budget=FEW_SHOT_TOKEN_BUDGET):
+    examples, used = [], 0
+    for record in records:
+        example = compact_example(record)
+        cost = estimate_tokens(json.dumps(example))
+        if used + cost > budget:
+            break
+        examples.append(example)
+        used += cost
+    return json.dumps(examples, indent=2)
 
 def load_resume_history(limit=3):
-    if not os.path.exists(HISTORY_FILE):
-        return "[]"
-    with open(HISTORY_FILE, "r") as f:
-        history = json.load(f)
-    return json.dumps(history[-limit:], indent=2)
-
-def save_to_history(new_result):
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
-    history.append(new_result)
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+    return fit_to_budget(history_store.last(limit))
+
+def load_similar_evaluations(job_embedding, k=FEW_SHOT_K):
+    matches = history_store.similar(job_embedding, k=k, min_score=FEW_SHOT_MIN_SIMILARITY)
+    return fit_to_budget(record for _, record in matches)
+
+def save_to_history(new_result, embedding=None):
+    history_store.append(new_result, embedding=embedding)
 
 # === Graph State ===
 class ScoringState(dict):
     resume_json: dict
     job_description: str
+    job_embedding: list
     parsed_result: dict
     feedback: str
 
 # === Node: Evaluate Resume ===
+@traced("scoring.evaluate_resume")
 def evaluate_resume(state: ScoringState):
     resume_json = state["resume_json"]
     job_description = state["job_description"]
@@ -94,7 +129,18 @@ Certifications: {', '.join(resume_json.get('achievements_like_awards_and_certifi
 Projects: {', '.join(resume_json.get('projects_built', []))}
 """
 
-    prior_context = load_resume_history()
+    # The caller embeds the job description (the API goes through its embedding
+    # cache and cpu_pool); without an embedding, recent history is used instead
+    job_embedding = state.get("job_embedding")
+    prior_context = None
+    if job_embedding is not None:
+        try:
+            prior_context = load_similar_evaluations(job_embedding)
+        except Exception as e:
+            print(f"[WARN] Similar-evaluation lookup failed, falling back to recent history: {e}")
+            job_embedding = None
+    if prior_context is None:
+        prior_context = load_resume_history()
 
     # Build chain and invoke LLM
     chain = prompt_template | llm | StrOutputParser()
@@ -110,7 +156,7 @@ Projects: {', '.join(resume_json.get('projects_built', []))}
             "resume_snippet": resume_text[:500],
             "job_description_snippet": job_description[:500],
             "result": result_json
-        })
+        }, embedding=job_embedding)
 
         feedback_text = f"""
 === Candidate Feedback ===
@@ -155,6 +201,53 @@ workflow.add_edge("evaluate_resume", END)
 
 scoring_graph = workflow.compile()
 
+# === Result Cache ===
+# Bumps automatically whenever the prompt text changes, so stale scores are never served
+PROMPT_VERSION = hashlib.sha256(prompt_template.template.encode("utf-8")).hexdigest()[:12]
+
+score_cache = TTLCache(
+    max_entries=int(os.getenv("SCORE_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("SCORE_CACHE_TTL", "86400")),
+    name="score"
+)
+
+def score_cache_key(resume_json: dict, job_description: str) -> str:
+    canonical_resume = json.dumps(resume_json, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    raw = "\0".join([PROMPT_VERSION, canonical_resume, normalize_text(job_description)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def cached_score(resume_json: dict, job_description: str) -> Optional[dict]:
+    hit, cached = score_cache.get(score_cache_key(resume_json, job_description))
+    return cached if hit else None
+
+def score_resume_uncached(resume_json: dict, job_description: str, job_embedding=None) -> dict:
+    """Runs the scoring graph and caches a successful result; `job_embedding` enables similar few-shots."""
+    result = scoring_graph.invoke({
+        "resume_json": resume_json,
+        "job_description": job_description,
+        "job_embedding": job_embedding
+    })
+    result = {
+        "parsed_result": result.get("parsed_result", {}),
+        "feedback": result.get("feedback", "")
+    }
+    # Only successful evaluations are worth replaying
+    if result["parsed_result"]:
+        score_cache.set(score_cache_key(resume_json, job_description), result)
+    return result
+
+def score_resume_cached(resume_json: dict, job_description: str, bypass_cache: bool = False,
+                        job_embedding=None):
+    """
+    Returns (result, cache_status) where cache_status is HIT, MISS or BYPASS.
+    A bypassed call still refreshes the cached entry.
+    """
+    if not bypass_cache:
+        cached = cached_score(resume_json, job_description)
+        if cached is not None:
+            return cached, "HIT"
+    return score_resume_uncached(resume_json, job_description, job_embedding), "BYPASS" if bypass_cache else "MISS"
+
 # === Tool Wrapper ===
 @tool
 def scoring_agent(input_str: str) -> dict:
@@ -166,11 +259,5 @@ def scoring_agent(input_str: str) -> dict:
     resume_json = data.get("resume_json", {})
     job_description = data.get("job_description", "")
 
-    result = scoring_graph.invoke({
-        "resume_json": resume_json,
-        "job_description": job_description
-    })
-    return {
-        "parsed_result": result.get("parsed_result", {}),
-        "feedback": result.get("feedback", "")
-    }
+    result, _ = score_resume_cached(resume_json, job_description)
+    return result
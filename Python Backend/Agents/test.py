@@ -1,24 +1,26 @@
 import os
-from langchain_groq import ChatGroq
+import sys
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 load_dotenv()
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Utils.llm_gateway import get_llm, LLM_BACKEND, LLM_MODEL
+
 # Make sure your env has GROQ_API_KEY set
 # Example: set it in .env or run: export GROQ_API_KEY="your_key"
+# LLM_BACKEND=fake runs the same call offline
 
 def test_chatgroq():
-    llm = ChatGroq(
-        model="openai/gpt-oss-120b",
-        api_key=os.getenv("GROQ_API_KEY")
-    )
+    llm = get_llm()
 
     response = llm.invoke([
         HumanMessage(content="Give me a short fun fact about space.")
     ])
 
-    print("Response from gpt-oss-120b:")
+    print(f"Response from {LLM_MODEL} ({LLM_BACKEND}):")
     print(response.content)
+    print(llm.stats())
 
 if __name__ == "__main__":
     test_chatgroq()
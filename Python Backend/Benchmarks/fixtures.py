@@ -0,0 +1,145 @@
+# fixtures.py
+# Deterministic benchmark inputs: text/scanned PDF and DOCX resumes, job
+# descriptions, feedback and search prompts. Files are generated on demand into
+# Benchmarks/fixtures/ (not committed), so every run drives identical bytes.
+import os
+import json
+from typing import Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CANDIDATES = [
+    ("Jane Doe", "Backend Developer", ["Python", "FastAPI", "PostgreSQL", "Docker", "AWS"], 4),
+    ("Arjun Mehta", "Data Scientist", ["Python", "PyTorch", "scikit-learn", "SQL", "MLOps"], 6),
+    ("Maria Garcia", "Frontend Engineer", ["TypeScript", "Angular", "React", "CSS", "Jest"], 3),
+    ("Wei Zhang", "DevOps Engineer", ["Kubernetes", "Terraform", "AWS", "Go", "Prometheus"], 8),
+    ("Sam Okafor", ".NET Developer", ["C#", "ASP.NET Core", "SQL Server", "Azure", "Entity Framework"], 5),
+]
+
+JOB_DESCRIPTIONS = [
+    "Senior Python backend engineer to build FastAPI microservices on AWS, with PostgreSQL, Docker "
+    "and CI/CD experience. 4+ years required; Kubernetes is a plus.",
+    "Data scientist with strong PyTorch and scikit-learn skills to own model training and MLOps "
+    "pipelines. Experience with SQL and experiment tracking required.",
+    "Frontend engineer (Angular or React, TypeScript) to build accessible dashboards with strong "
+    "testing discipline and attention to performance.",
+    "DevOps engineer to run Kubernetes clusters with Terraform, build observability with Prometheus "
+    "and Grafana, and automate deployments on AWS.",
+    ".NET developer for ASP.NET Core web APIs on Azure with SQL Server; clean architecture and unit "
+    "testing experience expected.",
+]
+
+FEEDBACK = [
+    "The interview process was smooth and the recruiter was very helpful.",
+    "I waited three weeks without any update, which was frustrating.",
+    "Questions were relevant to the role, but the schedule changed twice.",
+    "Great experience overall, the panel was friendly and well prepared.",
+    "The technical round felt rushed and the interviewer seemed distracted.",
+    "Clear communication at every step; I knew exactly what to expect.",
+    "The take-home assignment was far too long for an unpaid task.",
+    "Neutral experience, nothing particularly good or bad to report.",
+]
+
+SEARCH_PROMPTS = [
+    "python developer remote",
+    "data scientist bangalore",
+    "frontend angular engineer",
+    "devops kubernetes aws",
+    ".net developer azure",
+]
+
+
+def resume_text(index: int) -> str:
+    name, title, skills, years = CANDIDATES[index % len(CANDIDATES)]
+    variant = index // len(CANDIDATES)
+    return "\n".join([
+        name,
+        f"{title} | {name.lower().replace(' ', '.')}{variant}@example.com | +1 555 01{index:02d}",
+        "linkedin.com/in/" + name.lower().replace(" ", ""),
+        "",
+        "SUMMARY",
+        f"{title} with {years} years of experience delivering production systems.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+        f"{title}, Example Corp ({2024 - years}-2024): built and operated services using {skills[0]} and {skills[1]}.",
+        f"Led a migration to {skills[3]} that cut infrastructure cost by {10 + variant}%.",
+        "",
+        "PROJECTS",
+        f"Job portal API ({skills[0]}), analytics dashboard ({skills[2]}), internal CLI tooling.",
+        "",
+        "CERTIFICATIONS",
+        f"{skills[4]} certification, {2020 + variant % 4}",
+    ])
+
+
+def resume_json(index: int) -> dict:
+    name, title, skills, years = CANDIDATES[index % len(CANDIDATES)]
+    return {
+        "name": name,
+        "skills": skills,
+        "experience": f"{years} years as {title}",
+        "total_experience_years": float(years),
+        "projects_built": ["Job portal API", "Analytics dashboard"],
+        "achievements_like_awards_and_certifications": [f"{skills[4]} certification"],
+    }
+
+
+def write_text_pdf(text: str, path: str):
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 545, 800), text, fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def write_scanned_pdf(text: str, path: str, dpi: int = 150):
+    """Renders the text page to an image and stores only the image: no text layer, so it needs OCR."""
+    import fitz
+    source = fitz.open()
+    page = source.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 545, 800), text, fontsize=10)
+    pixmap = page.get_pixmap(dpi=dpi)
+    source.close()
+
+    doc = fitz.open()
+    scanned = doc.new_page()
+    scanned.insert_image(scanned.rect, stream=pixmap.tobytes("png"))
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(text: str, path: str):
+    from docx import Document
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def build_fixtures(variants: int = 5, directory: str = FIXTURES_DIR) -> Dict[str, List[str]]:
+    """Creates `variants` resumes of each kind (skipping files that already exist)."""
+    os.makedirs(directory, exist_ok=True)
+    writers = {"pdf": write_text_pdf, "scanned": write_scanned_pdf, "docx": write_docx}
+    files = {kind: [] for kind in writers}
+    for i in range(variants):
+        text = resume_text(i)
+        for kind, writer in writers.items():
+            extension = "docx" if kind == "docx" else "pdf"
+            path = os.path.join(directory, f"resume_{kind}_{i}.{extension}")
+            if not os.path.exists(path):
+                writer(text, path)
+            files[kind].append(path)
+
+    with open(os.path.join(directory, "texts.json"), "w", encoding="utf-8") as f:
+        json.dump({"job_descriptions": JOB_DESCRIPTIONS, "feedback": FEEDBACK, "search_prompts": SEARCH_PROMPTS},
+                  f, indent=2)
+    return files
+
+
+if __name__ == "__main__":
+    for kind, paths in build_fixtures().items():
+        print(f"[INFO] {kind}: {len(paths)} files in {FIXTURES_DIR}")
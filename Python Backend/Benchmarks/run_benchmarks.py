@@ -0,0 +1,275 @@
+# run_benchmarks.py
+# Offline load test for the FastAPI backend. By default it starts the external
+# API stubs and the app itself (both via uvicorn) on local ports, drives every
+# endpoint at the requested concurrency and writes a JSON baseline:
+#
+#   python -m Benchmarks.run_benchmarks --requests 200 --concurrency 16 --output baseline.json
+#   python -m Benchmarks.run_benchmarks --compare baseline.json   # exit 1 on regression
+#
+# --base-url benchmarks an already running server instead (peak RSS is then unknown).
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from Benchmarks import fixtures
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ["parse-resume", "score-resume", "embed", "analyze-feedback", "search_jobs", "charts"]
+
+
+# ---------------- Request builders ----------------
+def build_requests(files: Dict[str, List[str]], unique: bool) -> Dict[str, Callable[[int], dict]]:
+    """Each builder maps a request number to httpx.request kwargs."""
+    resumes = [(p, open(p, "rb").read()) for kind in ("pdf", "docx", "scanned") for p in files[kind]]
+    jds, feedback, prompts = fixtures.JOB_DESCRIPTIONS, fixtures.FEEDBACK, fixtures.SEARCH_PROMPTS
+
+    def suffix(i: int) -> str:
+        # --unique defeats the response caches so every request takes the cold path
+        return f" [{i}]" if unique else ""
+
+    def parse_resume(i):
+        path, content = resumes[i % len(resumes)]
+        return {"method": "POST", "url": "/parse-resume/",
+                "files": {"file": (os.path.basename(path), content)}}
+
+    def score_resume(i):
+        return {"method": "POST", "url": "/score-resume/",
+                "json": {"resume_json": fixtures.resume_json(i), "job_description": jds[i % len(jds)] + suffix(i)}}
+
+    def embed(i):
+        return {"method": "POST", "url": "/embed", "json": {"text": feedback[i % len(feedback)] + suffix(i)}}
+
+    def analyze_feedback(i):
+        return {"method": "POST", "url": "/analyze-feedback/", "json": {"feedback": feedback[i % len(feedback)] + suffix(i)}}
+
+    def search_jobs(i):
+        return {"method": "POST", "url": "/search_jobs", "json": {"custom_prompt": prompts[i % len(prompts)] + suffix(i)}}
+
+    def charts(i):
+        return {"method": "GET", "url": "/charts"}
+
+    return {"parse-resume": parse_resume, "score-resume": score_resume, "embed": embed,
+            "analyze-feedback": analyze_feedback, "search_jobs": search_jobs, "charts": charts}
+
+
+# ---------------- Load generation ----------------
+async def drive(client: httpx.AsyncClient, build: Callable[[int], dict], requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(**build(i))
+                await response.aread()
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    errors = sum(n for s, n in statuses.items() if not s.startswith("2"))
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4),
+        "statuses": statuses,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "throughput_rps": round(requests / wall, 2),
+    }
+
+
+# ---------------- Server processes ----------------
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Sum of the per-process peak RSS (VmHWM) of the server and its worker processes."""
+    pids = [pid]
+    try:
+        import psutil
+        pids += [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    except Exception:
+        pass
+    total_kb = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+        except (OSError, StopIteration):
+            continue
+    return round(total_kb / 1024, 1) if total_kb else None
+
+
+def start_uvicorn(target: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+def stub_env(stub_url: str) -> dict:
+    return {
+        "SERPER_API_URL": f"{stub_url}/search",
+        "SERPER_API_KEY": "stub",
+        "GROQ_BASE_URL": stub_url,
+        "GROQ_API_KEY": "stub",
+        "LLM_BACKEND": "groq",
+        "LLM_RPM": "0",  # the stub has no quota; measure the app, not the limiter
+        "CLOUDINARY_UPLOAD_PREFIX": stub_url,
+        "CLOUDINARY_CLOUD_NAME": "stub",
+        "CLOUDINARY_API_KEY": "stub",
+        "CLOUDINARY_API_SECRET": "stub",
+    }
+
+
+# ---------------- Baselines ----------------
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {now['throughput_rps']} req/s")
+        if now["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {before['error_rate']} -> {now['error_rate']}")
+    rss_now, rss_before = current.get("peak_rss_mb"), baseline.get("peak_rss_mb")
+    if rss_now and rss_before and rss_now > rss_before * (1 + tolerance):
+        regressions.append(f"peak RSS {rss_before}MB -> {rss_now}MB")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+async def run_suite(base_url: str, endpoints: List[str], requests: int, concurrency: int, unique: bool,
+                    variants: int) -> Dict[str, dict]:
+    builders = build_requests(fixtures.build_fixtures(variants), unique)
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits) as client:
+        for name in endpoints:
+            # One unmeasured request per endpoint loads lazy models before timing starts
+            try:
+                await client.request(**builders[name](0))
+            except httpx.HTTPError as e:
+                print(f"[WARN] Warm-up request for {name} failed: {type(e).__name__}")
+            results[name] = await drive(client, builders[name], requests, concurrency)
+            r = results[name]
+            print(f"[INFO] {name:<17} p50 {r['p50_ms']:>9.1f}ms  p95 {r['p95_ms']:>9.1f}ms  "
+                  f"p99 {r['p99_ms']:>9.1f}ms  {r['throughput_rps']:>8.1f} req/s  errors {r['errors']}")
+    return results
+
+
+def main():
+    cli = argparse.ArgumentParser(description="Benchmark the Companion-AI backend against local stubs")
+    cli.add_argument("--base-url", help="benchmark a running server instead of starting one")
+    cli.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    cli.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    cli.add_argument("--concurrency", type=int, default=8)
+    cli.add_argument("--unique", action="store_true", help="vary payloads so caches never hit")
+    cli.add_argument("--variants", type=int, default=5, help="resumes generated per file kind")
+    cli.add_argument("--app-port", type=int, default=8765)
+    cli.add_argument("--stub-port", type=int, default=9001)
+    cli.add_argument("--stub-latency-ms", type=float, default=50.0)
+    cli.add_argument("--output", help="write the results as a JSON baseline")
+    cli.add_argument("--compare", help="baseline JSON to compare against")
+    cli.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = cli.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        cli.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    processes = []
+    base_url, app_process = args.base_url, None
+    try:
+        if base_url is None:
+            stub_url = f"http://127.0.0.1:{args.stub_port}"
+            processes.append(start_uvicorn("Benchmarks.stub_servers:app", args.stub_port,
+                                           {"STUB_LATENCY_MS": str(args.stub_latency_ms)}))
+            wait_ready(f"{stub_url}/stats", processes[-1])
+            base_url = f"http://127.0.0.1:{args.app_port}"
+            app_process = start_uvicorn("app:app", args.app_port, stub_env(stub_url))
+            processes.append(app_process)
+            wait_ready(f"{base_url}/", app_process)
+
+        results = asyncio.run(run_suite(base_url, endpoints, args.requests, args.concurrency,
+                                        args.unique, args.variants))
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "requests_per_endpoint": args.requests,
+                "concurrency": args.concurrency,
+                "unique": args.unique,
+                "stub_latency_ms": args.stub_latency_ms if args.base_url is None else None,
+            },
+            "peak_rss_mb": peak_rss_mb(app_process.pid) if app_process else None,
+            "endpoints": results,
+        }
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print(f"[INFO] Peak RSS: {report['peak_rss_mb']} MB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Baseline written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[WARN] Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print("[INFO] No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
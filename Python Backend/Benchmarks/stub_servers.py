@@ -0,0 +1,121 @@
+# stub_servers.py
+# Local stand-ins for the external APIs the backend calls, for offline testing:
+#   uvicorn Benchmarks.stub_servers:app --port 9001
+#   SERPER_API_URL=http://127.0.0.1:9001/search
+#   GROQ_BASE_URL=http://127.0.0.1:9001 GROQ_API_KEY=stub
+#   CLOUDINARY_UPLOAD_PREFIX=http://127.0.0.1:9001 CLOUDINARY_CLOUD_NAME=stub
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from Utils.llm_gateway import fake_reply
+
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "50"))
+STUB_FAIL_RATE = float(os.getenv("STUB_FAIL_RATE", "0"))
+
+app = FastAPI(title="Companion-AI external API stubs")
+stats = {"serper_requests": 0, "groq_requests": 0, "cloudinary_uploads": 0}
+
+
+async def simulate_upstream():
+    if STUB_LATENCY_MS:
+        await asyncio.sleep(STUB_LATENCY_MS / 1000.0)
+    # Injected 503s exercise the client's retry/backoff path
+    if STUB_FAIL_RATE and random.random() < STUB_FAIL_RATE:
+        return JSONResponse(status_code=503, content={"message": "stub failure"})
+    return None
+
+
+# ---------------- Serper ----------------
+@app.post("/search")
+async def serper_search(request: Request):
+    stats["serper_requests"] += 1
+    failure = await simulate_upstream()
+    if failure is not None:
+        return failure
+
+    body = await request.json()
+    query = body.get("q", "")
+    page = int(body.get("page", 1))
+    num = int(body.get("num", 10))
+    slug = "-".join(query.lower().split()) or "job"
+    organic = []
+    for i in range(num):
+        n = (page - 1) * num + i
+        organic.append({
+            "title": f"{query.title()} #{n}",
+            # Every other result repeats across pages/variants (with tracking params) to exercise de-duplication
+            "link": f"https://jobs.example.com/{slug}/{n // 2}?utm_source=stub{page}",
+            "snippet": f"Example Corp - Remote - {query} opening number {n}",
+            "position": i + 1,
+        })
+    return {"searchParameters": body, "organic": organic}
+
+
+# ---------------- Groq (OpenAI-compatible chat completions) ----------------
+def completion_chunk(completion_id: str, model: str, delta: dict, finish_reason=None, usage=None) -> str:
+    chunk = {
+        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    if usage:
+        chunk["x_groq"] = {"id": completion_id, "usage": usage}
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    stats["groq_requests"] += 1
+    failure = await simulate_upstream()
+    if failure is not None:
+        return failure
+
+    body = await request.json()
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    # Same canned, agent-shaped answers as the in-process fake backend
+    text = fake_reply(prompt)
+    model = body.get("model", "stub")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+             "total_tokens": (len(prompt) + len(text)) // 4}
+
+    if body.get("stream"):
+        async def events():
+            yield completion_chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for i in range(0, len(text), 16):
+                yield completion_chunk(completion_id, model, {"content": text[i:i + 16]})
+            yield completion_chunk(completion_id, model, {}, "stop", usage)
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {
+        "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+# ---------------- Cloudinary ----------------
+@app.post("/v1_1/{cloud_name}/{resource_type}/upload")
+async def cloudinary_upload(cloud_name: str, resource_type: str, request: Request):
+    stats["cloudinary_uploads"] += 1
+    failure = await simulate_upstream()
+    if failure is not None:
+        return failure
+
+    size = len(await request.body())
+    public_id = f"Mock-Interview/{uuid.uuid4().hex[:16]}"
+    return {
+        "public_id": public_id, "resource_type": "raw" if resource_type == "auto" else resource_type,
+        "bytes": size, "secure_url": f"https://res.cloudinary.example/{cloud_name}/{public_id}",
+    }
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
@@ -1,25 +1,79 @@
-from sentence_transformers import SentenceTransformer, util
+from functools import lru_cache
+from typing import Dict, List
 
-# Load pretrained SentenceTransformer model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+
+from Utils.encoder import get_model
 
 # Define labels and their mapped scores
 sentiment_labels = ["positive", "negative", "neutral"]
 sentiment_scores = {"positive": 1, "negative": -1, "neutral": 0}
 
-# Pre-encode the labels
-label_embeddings = model.encode(sentiment_labels, convert_to_tensor=True)
+# Each label is represented by the mean embedding of several phrasings,
+# which separates real feedback far better than the bare label words.
+label_prototypes = {
+    "positive": [
+        "positive",
+        "This was a great experience.",
+        "I am very satisfied and happy with it.",
+        "Excellent, helpful and easy to use.",
+        "Everything worked really well, thank you!",
+    ],
+    "negative": [
+        "negative",
+        "This was a terrible experience.",
+        "I am disappointed and frustrated.",
+        "It is confusing, slow and keeps failing.",
+        "Nothing worked and I would not recommend it.",
+    ],
+    "neutral": [
+        "neutral",
+        "It was okay, nothing special.",
+        "I have no strong opinion about it.",
+        "Some parts were fine, others were average.",
+        "It does what it says.",
+    ],
+}
+
+# Softmax temperature over cosine similarities; lower = more peaked confidences
+CONFIDENCE_TEMPERATURE = 0.05
+
+# Pre-encode the label prototypes (once, on first use, with the shared model)
+@lru_cache(maxsize=1)
+def get_label_matrix() -> np.ndarray:
+    phrases = [p for label in sentiment_labels for p in label_prototypes[label]]
+    embeddings = get_model().encode(phrases, convert_to_numpy=True, normalize_embeddings=True)
+    prototypes, start = [], 0
+    for label in sentiment_labels:
+        count = len(label_prototypes[label])
+        prototypes.append(embeddings[start:start + count].mean(axis=0))
+        start += count
+    prototypes = np.stack(prototypes)
+    return prototypes / np.linalg.norm(prototypes, axis=1, keepdims=True)
+
+def analyze_feedback_batch(feedbacks: List[str], batch_size: int = 64) -> List[Dict]:
+    if not feedbacks:
+        return []
+
+    # One encode call for the whole batch, one matrix multiply for all similarities
+    embeddings = get_model().encode(feedbacks, batch_size=batch_size,
+                                    convert_to_numpy=True, normalize_embeddings=True)
+    similarities = embeddings @ get_label_matrix().T
+
+    logits = similarities / CONFIDENCE_TEMPERATURE
+    logits -= logits.max(axis=1, keepdims=True)
+    confidences = np.exp(logits)
+    confidences /= confidences.sum(axis=1, keepdims=True)
+
+    results = []
+    for row in confidences:
+        label = sentiment_labels[int(row.argmax())]
+        results.append({
+            "label": label,
+            "sentiment_score": sentiment_scores[label],
+            "confidences": {l: round(float(c), 4) for l, c in zip(sentiment_labels, row)},
+        })
+    return results
 
 def analyze_feedback(feedback: str) -> int:
-    # Encode feedback
-    feedback_embedding = model.encode(feedback, convert_to_tensor=True)
-    
-    # Compute cosine similarity with each label
-    similarities = util.cos_sim(feedback_embedding, label_embeddings)[0]
-    
-    # Pick best label
-    best_match = int(similarities.argmax())
-    label = sentiment_labels[best_match]
-    
-    # Return mapped score
-    return sentiment_scores[label]
+    return analyze_feedback_batch([feedback])[0]["sentiment_score"]
@@ -0,0 +1,215 @@
+# audio_analysis.py
+import os
+import time
+import argparse
+from math import gcd
+from typing import Dict, Optional
+
+import numpy as np
+
+# fast (default): 16 kHz, one framing pass, YIN on voiced frames only (ZCR stays at the input rate)
+# librosa: the original 44.1 kHz librosa.load + rms + zcr + pyin path
+AUDIO_ANALYSIS_MODE = os.getenv("AUDIO_ANALYSIS_MODE", "fast").lower()
+AUDIO_ANALYSIS_RATE = int(os.getenv("AUDIO_ANALYSIS_RATE", "16000"))
+
+RECORDING_RATE = 44100
+# librosa's default 2048/512 frames at 44.1 kHz, kept in seconds so the metrics stay comparable
+FRAME_SECONDS = 2048 / RECORDING_RATE
+HOP_SECONDS = 512 / RECORDING_RATE
+SILENCE_RMS = 0.01
+FMIN, FMAX = 75.0, 400.0
+YIN_THRESHOLD = 0.1
+YIN_MAX_APERIODICITY = 0.35
+
+
+def _metrics(energy: float, pitch: float, silence_ratio: float, speaking_rate_bpm: float) -> Dict[str, float]:
+    return {"average_energy": round(energy, 4), "pitch_estimate": round(pitch, 2),
+            "silence_ratio": round(silence_ratio, 4), "speaking_rate_bpm": round(speaking_rate_bpm, 2)}
+
+
+def load_wav(path: str):
+    """Reads a WAV as mono float32 in [-1, 1] without going through librosa/audioread."""
+    from scipy.io import wavfile
+    sr, data = wavfile.read(path)
+    if data.dtype.kind == "i":
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    elif data.dtype.kind == "u":
+        data = (data.astype(np.float32) - 128.0) / 128.0
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    return data.astype(np.float32, copy=False), sr
+
+
+def resample(y: np.ndarray, sr: int, target: int) -> np.ndarray:
+    if sr == target:
+        return y
+    from scipy.signal import resample_poly
+    g = gcd(sr, target)
+    return resample_poly(y, target // g, sr // g).astype(np.float32, copy=False)
+
+
+def yin_pitch(frames: np.ndarray, sr: int, fmin: float = FMIN, fmax: float = FMAX) -> np.ndarray:
+    """
+    Vectorized YIN over a (n_frames, frame_length) matrix; the difference function
+    comes from one FFT autocorrelation per batch. Returns f0 per frame, NaN where
+    the frame is not periodic enough.
+    """
+    n, length = frames.shape
+    if n == 0:
+        return np.empty(0, dtype=np.float32)
+    tau_min, tau_max = int(sr / fmax), min(int(sr / fmin), length // 2)
+
+    spectrum = np.fft.rfft(frames, n=2 * length, axis=1)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :tau_max + 1]
+    # Energies of the two windows compared at each lag
+    energy = np.cumsum(frames ** 2, axis=1)
+    total = energy[:, -1:]
+    lags = np.arange(tau_max + 1)
+    head = total - np.concatenate([np.zeros((n, 1)), energy[:, :-1]], axis=1)[:, lags]
+    tail = np.concatenate([np.zeros((n, 1)), energy], axis=1)[:, length - lags]
+    diff = np.maximum(head + tail - 2 * acf, 0.0)
+
+    # Cumulative mean normalized difference
+    cmnd = np.ones_like(diff)
+    running = np.cumsum(diff[:, 1:], axis=1)
+    cmnd[:, 1:] = diff[:, 1:] * np.arange(1, tau_max + 1) / np.maximum(running, 1e-12)
+
+    window = cmnd[:, tau_min:tau_max + 1]
+    below = window < YIN_THRESHOLD
+    # First lag under the threshold, walked down to its local minimum; else the global minimum
+    first = np.where(below.any(axis=1), below.argmax(axis=1), window.argmin(axis=1))
+    rows = np.arange(n)
+    for _ in range(tau_max):
+        nxt = np.minimum(first + 1, window.shape[1] - 1)
+        step = window[rows, nxt] < window[rows, first]
+        if not step.any():
+            break
+        first = np.where(step, nxt, first)
+
+    # Parabolic interpolation around the chosen lag
+    left = window[rows, np.maximum(first - 1, 0)]
+    mid = window[rows, first]
+    right = window[rows, np.minimum(first + 1, window.shape[1] - 1)]
+    denom = left - 2 * mid + right
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / np.where(denom == 0, 1, denom), 0.0)
+    tau = tau_min + first + np.clip(shift, -1, 1)
+
+    f0 = sr / tau
+    f0[mid > YIN_MAX_APERIODICITY] = np.nan
+    return f0.astype(np.float32)
+
+
+def mean_zero_crossing_rate(y: np.ndarray, sr: int) -> float:
+    """
+    Mean per-frame ZCR over centered 2048/512-style frames, from one prefix sum of
+    sign changes instead of a framed copy. Computed at the input rate: resampling
+    would drop the high-frequency crossings the speaking-rate metric is built on.
+    """
+    frame, hop = int(round(FRAME_SECONDS * sr)), int(round(HOP_SECONDS * sr))
+    padded = np.pad(y, frame // 2, mode="edge")
+    signs = np.signbit(padded)
+    crossings = np.concatenate([[0], np.cumsum(signs[1:] != signs[:-1])])
+    starts = np.arange(0, max(1, padded.size - frame + 1), hop)
+    ends = np.minimum(starts + frame - 1, padded.size - 1)
+    return float(np.mean((crossings[ends] - crossings[starts]) / frame))
+
+
+def analyze_audio_fast(y: np.ndarray, sr: int, target_sr: int = AUDIO_ANALYSIS_RATE) -> Dict[str, float]:
+    y = np.asarray(y, dtype=np.float32).ravel()
+    if y.size == 0:
+        return _metrics(0.0, 0.0, 1.0, 0.0)
+    speaking_rate_bpm = mean_zero_crossing_rate(y, sr) * 60.0 * sr / 512.0
+
+    y = resample(y, sr, target_sr)
+    sr = target_sr
+    frame, hop = int(round(FRAME_SECONDS * sr)), int(round(HOP_SECONDS * sr))
+
+    # One centered framing pass (a strided view, no copy) feeds energy, silence and pitch
+    padded = np.pad(y, frame // 2)
+    if padded.size < frame:
+        padded = np.pad(padded, (0, frame - padded.size))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame)[::hop]
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    energy = float(np.mean(rms))
+    silence_ratio = float(np.mean(rms < SILENCE_RMS))
+
+    # Pitch only on frames with voice-level energy
+    voiced = rms >= SILENCE_RMS
+    f0 = yin_pitch(frames[voiced].astype(np.float64), sr)
+    pitch = float(np.nanmean(f0)) if f0.size and not np.all(np.isnan(f0)) else 0.0
+    return _metrics(energy, pitch, silence_ratio, speaking_rate_bpm)
+
+
+def analyze_audio_librosa(path: str) -> Dict[str, float]:
+    import librosa
+
+    y, sr = librosa.load(path, sr=RECORDING_RATE)
+    rms = librosa.feature.rms(y=y)[0]
+    energy = float(np.mean(rms)) if rms.size > 0 else 0.0
+    silence_ratio = float(np.sum(rms < SILENCE_RMS) / len(rms)) if rms.size > 0 else 1.0
+    try:
+        # sr must be passed: pyin otherwise assumes 22.05 kHz and reports half the pitch
+        f0, _, _ = librosa.pyin(y, fmin=FMIN, fmax=FMAX, sr=sr)
+        pitch = float(np.nanmean(f0)) if f0 is not None and not np.all(np.isnan(f0)) else 0.0
+    except Exception:
+        pitch = 0.0
+    zcr = librosa.feature.zero_crossing_rate(y=y)[0]
+    speaking_rate_bpm = float(np.mean(zcr) * 60.0 * sr / 512.0)
+    return _metrics(energy, pitch, silence_ratio, speaking_rate_bpm)
+
+
+def analyze_audio(path: str, samples: Optional[np.ndarray] = None, sr: int = RECORDING_RATE) -> Dict[str, float]:
+    """`samples` (float, in [-1, 1] at `sr`) skips re-reading the WAV in the fast mode."""
+    if AUDIO_ANALYSIS_MODE == "librosa":
+        return analyze_audio_librosa(path)
+    if samples is None:
+        samples, sr = load_wav(path)
+    return analyze_audio_fast(samples, sr)
+
+
+def compare_with_librosa(path: str) -> dict:
+    started = time.perf_counter()
+    baseline = analyze_audio_librosa(path)
+    baseline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    samples, sr = load_wav(path)
+    fast = analyze_audio_fast(samples, sr)
+    fast_seconds = time.perf_counter() - started
+
+    return {
+        "audio_seconds": round(len(samples) / sr, 2),
+        "librosa_seconds": round(baseline_seconds, 3),
+        "fast_seconds": round(fast_seconds, 3),
+        "speedup": round(baseline_seconds / fast_seconds, 1) if fast_seconds else None,
+        "librosa": baseline,
+        "fast": fast,
+        "abs_delta": {k: round(abs(fast[k] - baseline[k]), 4) for k in baseline},
+    }
+
+
+def synthetic_speech(seconds: float, sr: int = RECORDING_RATE, seed: int = 0) -> np.ndarray:
+    """Harmonic 'syllables' with a gliding pitch, separated by pauses and light noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    gate = (np.sin(2 * np.pi * 2.5 * t) > -0.2).astype(np.float32)
+    y = 0.3 * voice * gate + 0.003 * rng.standard_normal(t.size)
+    return (y / np.max(np.abs(y))).astype(np.float32)
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Compare the fast audio metrics against the librosa/pyin path")
+    cli.add_argument("wav", nargs="?", help="recording to analyse (default: synthetic speech)")
+    cli.add_argument("--seconds", type=float, default=30.0, help="length of the synthetic recording")
+    args = cli.parse_args()
+
+    path = args.wav
+    if path is None:
+        from scipy.io import wavfile
+        path = "synthetic_speech.wav"
+        wavfile.write(path, RECORDING_RATE, np.int16(synthetic_speech(args.seconds) * 32767))
+    print(compare_with_librosa(path))
@@ -0,0 +1,110 @@
+# charts_store.py
+import os
+import gzip
+import json
+import hashlib
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip is offered
+    brotli = None
+
+
+class Representation:
+    """One JSON document, serialized once and pre-compressed in every supported encoding."""
+
+    def __init__(self, payload, mtime: float):
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(raw).hexdigest()[:20] + '"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.mtime = int(mtime)
+        self.bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(raw, quality=11)
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name)
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def is_not_modified(rep: Representation, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or rep.etag in tags
+    if if_modified_since:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= rep.mtime
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ChartsStore:
+    """
+    Serves charts.json from memory. The file is re-read only when its mtime or
+    size changes; the whole document and each chart are kept as pre-compressed
+    representations with an ETag, so a request is a stat() plus a dict lookup.
+    A file caught half-written is skipped and the last good version kept serving.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = None
+        self._bad_signature = None
+        self._all: Optional[Representation] = None
+        self._charts: Dict[str, Representation] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _refresh(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature in (self._signature, self._bad_signature) and self._all is not None:
+            return
+        with self._lock:
+            if signature in (self._signature, self._bad_signature) and self._all is not None:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except ValueError as e:
+                # Usually a writer mid-rewrite; retried once the mtime or size changes again
+                self._bad_signature = signature
+                if self._all is None:
+                    raise
+                print(f"[WARN] {self.path} is not valid JSON, serving the previous version: {e}")
+                return
+            self._all = Representation(data, stat.st_mtime)
+            self._charts = {name: Representation({name: html}, stat.st_mtime) for name, html in data.items()}
+            self._signature = signature
+            self.reloads += 1
+            print(f"[INFO] Loaded {len(self._charts)} charts from {self.path}")
+
+    def get(self, name: Optional[str] = None) -> Optional[Representation]:
+        """The whole document, or one chart as {name: html}; None for an unknown chart."""
+        self._refresh()
+        return self._all if name is None else self._charts.get(name)
+
+    def names(self):
+        self._refresh()
+        return list(self._charts)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "charts": len(self._charts),
+            "reloads": self.reloads,
+            "encodings": list(self._all.bodies) if self._all else [],
+            "bytes": {k: len(v) for k, v in self._all.bodies.items()} if self._all else {},
+        }
@@ -9,6 +9,8 @@ cloudinary.config(
     cloud_name= os.getenv("CLOUDINARY_CLOUD_NAME"),
     api_key= os.getenv("CLOUDINARY_API_KEY"),
     api_secret= os.getenv("CLOUDINARY_API_SECRET"),
+    # Only set for offline runs against Benchmarks/stub_servers.py
+    upload_prefix= os.getenv("CLOUDINARY_UPLOAD_PREFIX") or None,
     secure=True
 )
 
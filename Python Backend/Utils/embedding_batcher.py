@@ -0,0 +1,103 @@
+# embedding_batcher.py
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into a single batched call.
+
+    Items submitted within `max_wait_ms` of each other (up to `max_batch_size`)
+    are handed to `encode_fn` as one list, so the model pays tokenizer/forward
+    overhead once per batch instead of once per request. `runner(fn, items)`
+    decides where the encode call executes (default: the loop's executor).
+    """
+
+    def __init__(self,
+                 encode_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0,
+                 runner: Optional[Callable[..., Awaitable[Any]]] = None):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.runner = runner or self._run_in_default_executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+
+    @staticmethod
+    async def _run_in_default_executor(fn, items):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, items)
+
+    def _ensure_worker(self):
+        if self._worker_task is None or self._worker_task.done():
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.get_running_loop().create_task(self._worker())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        if not items:
+            return []
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            futures.append(future)
+            await self._queue.put((item, future))
+        return list(await asyncio.gather(*futures))
+
+    async def _collect_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Anything already queued joins the batch without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._collect_batch()
+            # Drop requests whose client already went away
+            batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self.runner(self.encode_fn, items)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
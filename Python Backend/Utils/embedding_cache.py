@@ -0,0 +1,186 @@
+# embedding_cache.py
+import os
+import re
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from Utils.file_lock import file_lock
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class DiskTier:
+    """
+    Append-only on-disk store: `vectors.f32` holds raw float32 rows and is read
+    through a memory map, `keys.txt` holds one "key row" line per vector. Rows
+    come from the vectors file size, so a crash between the two appends leaves an
+    orphaned vector, never a key pointing at the wrong one. Writers from several
+    worker processes are serialized with flock.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, ".lock")
+        self.dim = None
+        self.rows = {}
+        self._keys_offset = 0
+        self._mmap = None
+        self._load_new_keys()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _row_bytes(self) -> int:
+        return self.dim * np.dtype(np.float32).itemsize
+
+    def _complete_rows(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // self._row_bytes()
+
+    def _load_meta(self):
+        # Another process may have written the first rows (and so fixed the dimension) since we opened
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+
+    def _load_new_keys(self):
+        # Picks up keys appended by other processes since the last read
+        if not os.path.exists(self.keys_path) or os.path.getsize(self.keys_path) == self._keys_offset:
+            return
+        self._load_meta()
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            chunk = f.read()
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        available = self._complete_rows()
+        for line in complete.splitlines():
+            key, _, row = line.decode("ascii").partition(" ")
+            # Old one-key-per-line entries carry no row and are simply recomputed
+            if row.isdigit() and int(row) < available:
+                self.rows[key] = int(row)
+        self._keys_offset += len(complete)
+
+    def _vectors(self):
+        needed = max(self.rows.values(), default=-1) + 1
+        if self._mmap is None or self._mmap.shape[0] < needed:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(needed, self.dim))
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            self._load_new_keys()
+            row = self.rows.get(key)
+            if row is None:
+                return None
+        return np.array(self._vectors()[row])
+
+    def put_many(self, items):
+        items = [(k, v) for k, v in items if k not in self.rows]
+        if not items:
+            return
+        with file_lock(self.lock_path):
+            self._load_meta()
+            if self.dim is None:
+                self.dim = int(items[0][1].shape[-1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+            self._load_new_keys()
+            items = list({k: v for k, v in items if k not in self.rows}.items())
+            if not items:
+                return
+            with open(self.vectors_path, "ab") as vf:
+                # Drop a torn row left by a crashed writer so new rows start on a boundary
+                first = vf.tell() // self._row_bytes()
+                if vf.tell() != first * self._row_bytes():
+                    vf.truncate(first * self._row_bytes())
+                for _, vector in items:
+                    vf.write(np.asarray(vector, dtype=np.float32).tobytes())
+                vf.flush()
+                os.fsync(vf.fileno())
+            with open(self.keys_path, "ab") as kf:
+                kf.write("".join(f"{k} {first + i}\n" for i, (k, _) in enumerate(items)).encode("ascii"))
+            self._load_new_keys()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by sha256(model name, normalized text):
+    a bounded in-memory LRU in front of an optional memory-mapped disk tier.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 10000, disk_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = None
+        if disk_dir:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+            self.disk = DiskTier(os.path.join(disk_dir, safe_name))
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        results = []
+        with self._lock:
+            for text in texts:
+                key = cache_key(self.model_name, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                elif self.disk is not None and (vector := self.disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        items = [(cache_key(self.model_name, t), np.asarray(v, dtype=np.float32)) for t, v in zip(texts, vectors)]
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            if self.disk is not None:
+                self.disk.put_many(items)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
@@ -0,0 +1,16 @@
+# encoder.py
+import os
+from typing import List
+
+from Utils import model_registry
+
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "64"))
+
+def get_model():
+    return model_registry.get("minilm")
+
+def encode_texts(texts: List[str]):
+    # Module-level so it can be shipped to process-pool workers,
+    # each of which lazily loads its own copy of the model.
+    return get_model().encode(texts, batch_size=EMBED_MAX_BATCH)
@@ -0,0 +1,117 @@
+# executors.py
+import os
+import asyncio
+import functools
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from Utils import metrics
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a pool already has max_workers + max_queue calls in flight."""
+
+    def __init__(self, pool_name: str):
+        super().__init__(f"{pool_name} pool is saturated, retry later")
+        self.pool_name = pool_name
+
+
+class BoundedPool:
+    """
+    Thread or process pool with a hard cap on in-flight calls.
+
+    `run` rejects immediately with PoolSaturatedError once the cap is reached
+    (the API turns that into a 429), so a burst of heavy calls queues a bounded
+    amount of work instead of stalling the event loop or growing without limit.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 4, max_queue: int = 8):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = None
+        self._in_flight = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def executor(self):
+        # Created lazily so importing the app does not fork/spawn workers
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+            else:
+                start_method = os.getenv("CPU_POOL_START_METHOD", "spawn")
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context(start_method)
+                )
+        return self._executor
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        if not self._try_acquire():
+            raise PoolSaturatedError(self.name)
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "thread":
+                # Keep request-scoped context (e.g. tracing) inside worker threads
+                call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+                return await loop.run_in_executor(self.executor, call)
+            # Spans recorded in the worker process come back with the result
+            result, spans = await loop.run_in_executor(
+                self.executor, functools.partial(metrics.collect_spans, fn, *args, **kwargs)
+            )
+            metrics.merge_spans(spans)
+            return result
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# I/O-bound work (Groq calls, the interview flow) runs on threads;
+# CPU-bound work (PDF parsing, OCR, encoding) runs in worker processes.
+llm_pool = BoundedPool(
+    "llm",
+    kind="thread",
+    max_workers=int(os.getenv("LLM_POOL_WORKERS", "16")),
+    max_queue=int(os.getenv("LLM_POOL_QUEUE", "32")),
+)
+cpu_pool = BoundedPool(
+    "cpu",
+    kind=os.getenv("CPU_POOL_KIND", "process"),
+    max_workers=int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("CPU_POOL_QUEUE", "16")),
+)
@@ -0,0 +1,20 @@
+# file_lock.py
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no cross-process locking, one writer process only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive flock on `path`, serializing writers across worker processes."""
+    with open(path, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
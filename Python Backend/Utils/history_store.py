@@ -0,0 +1,178 @@
+# history_store.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class HistoryStore:
+    """
+    Append-only evaluation history on SQLite in WAL mode.
+
+    Appends are a single INSERT, "last k" is an index range scan, and several
+    worker processes can write concurrently (SQLite serializes the writers).
+    Old rows are trimmed by count/age every `compact_every` appends.
+
+    Rows may carry an embedding (float32 blob); `similar` searches those with an
+    in-memory matrix that is refreshed incrementally from new row ids.
+    """
+
+    def __init__(self, path: str, max_rows: int = 10000, max_age_days: float = 0,
+                 compact_every: int = 200, legacy_json: Optional[str] = None):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self.compact_every = compact_every
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._appends = 0
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._index_lock = threading.Lock()
+        self._index_ids = np.empty(0, dtype=np.int64)
+        self._index_matrix = None
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._initialize(conn)
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    record TEXT NOT NULL,
+                    embedding BLOB
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(history)")]
+            if "embedding" not in columns:  # databases created before embeddings were stored
+                try:
+                    conn.execute("ALTER TABLE history ADD COLUMN embedding BLOB")
+                except sqlite3.OperationalError as e:
+                    # Another worker process migrated it first
+                    if "duplicate column" not in str(e):
+                        raise
+            self._import_legacy(conn)
+            self._initialized = True
+
+    def _import_legacy(self, conn: sqlite3.Connection):
+        # One-time migration of the old resume_history.json list
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, "r") as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            return  # another worker process imported it first
+        except Exception as e:
+            print(f"[WARN] Could not import {self.legacy_json}: {e}")
+            return
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 0:
+                conn.executemany(
+                    "INSERT INTO history (created_at, record) VALUES (?, ?)",
+                    [(now, json.dumps(r)) for r in records[-self.max_rows:]],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(self.legacy_json, self.legacy_json + ".migrated")
+        except FileNotFoundError:
+            pass  # renamed by another worker that imported concurrently
+
+    def append(self, record: dict, embedding=None) -> int:
+        blob = None
+        if embedding is not None:
+            blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        cursor = self._conn().execute(
+            "INSERT INTO history (created_at, record, embedding) VALUES (?, ?, ?)",
+            (time.time(), json.dumps(record), blob),
+        )
+        self._appends += 1
+        if self.compact_every and self._appends % self.compact_every == 0:
+            self.compact()
+        return cursor.lastrowid
+
+    def last(self, k: int = 3) -> List[dict]:
+        rows = self._conn().execute(
+            "SELECT record FROM history ORDER BY id DESC LIMIT ?", (k,)
+        ).fetchall()
+        return [json.loads(r[0]) for r in reversed(rows)]
+
+    def _refresh_index(self, conn: sqlite3.Connection):
+        last_id = int(self._index_ids[-1]) if self._index_ids.size else 0
+        rows = conn.execute(
+            "SELECT id, embedding FROM history WHERE id > ? AND embedding IS NOT NULL ORDER BY id", (last_id,)
+        ).fetchall()
+        ids, matrix = self._index_ids, self._index_matrix
+        if rows:
+            new = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+            new /= np.maximum(np.linalg.norm(new, axis=1, keepdims=True), 1e-12)
+            ids = np.concatenate([ids, np.array([r[0] for r in rows], dtype=np.int64)])
+            matrix = new if matrix is None else np.vstack([matrix, new])
+        # Drop rows removed by compaction
+        min_id = conn.execute("SELECT MIN(id) FROM history").fetchone()[0] or 0
+        if ids.size and ids[0] < min_id:
+            keep = ids >= min_id
+            ids, matrix = ids[keep], matrix[keep]
+        self._index_ids, self._index_matrix = ids, matrix
+
+    def similar(self, embedding, k: int = 3, min_score: float = 0.0) -> List[Tuple[float, dict]]:
+        conn = self._conn()
+        with self._index_lock:
+            self._refresh_index(conn)
+            ids, matrix = self._index_ids, self._index_matrix
+        if matrix is None or not ids.size:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix @ query
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = [i for i in top[np.argsort(-scores[top])] if scores[i] >= min_score]
+        if not top:
+            return []
+
+        wanted = [int(ids[i]) for i in top]
+        placeholders = ",".join("?" * len(wanted))
+        records = dict(conn.execute(
+            f"SELECT id, record FROM history WHERE id IN ({placeholders})", wanted
+        ).fetchall())
+        return [(float(scores[i]), json.loads(records[int(ids[i])])) for i in top if int(ids[i]) in records]
+
+    def compact(self) -> int:
+        conn = self._conn()
+        removed = 0
+        if self.max_rows:
+            removed += conn.execute(
+                "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?", (self.max_rows,)
+            ).rowcount
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            removed += conn.execute("DELETE FROM history WHERE created_at < ?", (cutoff,)).rowcount
+        if removed:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM history").fetchone()[0]
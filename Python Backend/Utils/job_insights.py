@@ -1,119 +1,447 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
+# job_insights.py
+# Insights over ai_job_market_insights.csv. The dataset is loaded once into a
+# typed columnar frame (categoricals, cached as Parquet) and reduced to small
+# additive "cubes": job count and salary sum per combination of the filter
+# columns and one view's own columns (salary band, skill, job title, or a chart
+# breakdown). Every filtered view is a re-aggregation of its cube, whose size
+# depends on how many values the columns take, not on the row count. Appended
+# rows only need their own cubes added. `python -m Utils.job_insights` still
+# writes charts.json.
+import io
+import os
 import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
 
-# Load dataset
-df = pd.read_csv("./Datasets/ai_job_market_insights.csv")
-
-charts = {}
-
-# 1. Average Salary by Job Title
-fig1 = px.bar(
-    df.groupby("Job_Title", as_index=False)["Salary_USD"].mean().sort_values(by="Salary_USD", ascending=False),
-    x="Job_Title", y="Salary_USD",
-    title="Average Salary by Job Title", text_auto=True
-)
-fig1.update_traces(textposition="outside")
-fig1.update_layout(xaxis_tickangle=-45, showlegend=False)
-charts["salary_by_job"] = pio.to_html(fig1, full_html=False, include_plotlyjs='cdn')
-
-# 2. Jobs by Industry
-fig2 = px.pie(df, names="Industry", title="Distribution of Jobs by Industry", hole=0.3)
-fig2.update_traces(textinfo='percent+label')
-charts["jobs_by_industry"] = pio.to_html(fig2, full_html=False, include_plotlyjs=False)
-
-# 3. Salary Distribution
-fig3 = px.histogram(df, x="Salary_USD", nbins=30, title="Salary Distribution", marginal="box")
-fig3.update_traces(marker_color="indianred")
-charts["salary_distribution"] = pio.to_html(fig3, full_html=False, include_plotlyjs=False)
-
-# 4. Salary vs AI Adoption
-fig4 = px.box(df, x="AI_Adoption_Level", y="Salary_USD", title="Salary vs AI Adoption Level by Company")
-charts["salary_vs_ai"] = pio.to_html(fig4, full_html=False, include_plotlyjs=False)
-
-# 5. Remote Friendly Jobs
-fig5 = px.histogram(
-    df, x="Industry", color="Remote_Friendly",
-    title="Remote-Friendly Jobs by Industry", barmode="group", text_auto=True
-)
-fig5.update_layout(xaxis_tickangle=-45)
-charts["remote_friendly"] = pio.to_html(fig5, full_html=False, include_plotlyjs=False)
-
-# 6. Automation Risk
-fig6 = px.histogram(
-    df, x="Industry", color="Automation_Risk",
-    title="Automation Risk factor for jobs", barmode="group", text_auto=True
-)
-fig6.update_layout(xaxis_tickangle=-45)
-charts["automation_risk"] = pio.to_html(fig6, full_html=False, include_plotlyjs=False)
-
-# 7. AI Adoption
-fig7 = px.histogram(
-    df, x="Industry", color="AI_Adoption_Level",
-    title="Automation Adoption factor for jobs", barmode="group", text_auto=True
-)
-fig7.update_layout(xaxis_tickangle=-45)
-charts["ai_adoption"] = pio.to_html(fig7, full_html=False, include_plotlyjs=False)
-
-# 8. Job Growth Projections
-fig8 = px.histogram(
-    df, x="Job_Title", color="Job_Growth_Projection",
-    title="Job Growth Projections", barmode="group", text_auto=True,
-    color_discrete_map={"High": "#1f77b4", "Moderate": "#ff7f0e", "Low": "#2ca02c"}
-)
-fig8.update_layout(xaxis_tickangle=-45)
-charts["job_growth"] = pio.to_html(fig8, full_html=False, include_plotlyjs=False)
-
-
-stats = {
-    "total_jobs": int(len(df)),
-    "top_skill": df["Skills"].value_counts().idxmax() if "Skills" in df.columns else "N/A",
-    "average_salary": round(df["Salary_USD"].mean(), 2)
-}
+import numpy as np
+import pandas as pd
 
-# Skills breakdown
-skills = {
-    "labels": df["Skills"].value_counts().index.tolist()[:10] if "Skills" in df.columns else [],
-    "data": df["Skills"].value_counts().values.tolist()[:10] if "Skills" in df.columns else []
-}
+from Utils.ttl_cache import TTLCache
 
-# Salary range distribution
-salary_range = {
-    "labels": ["0-50k", "50k-100k", "100k-150k", "150k+"],
-    "data": [
-        int(len(df[df["Salary_USD"] <= 50000])),
-        int(len(df[(df["Salary_USD"] > 50000) & (df["Salary_USD"] <= 100000)])),
-        int(len(df[(df["Salary_USD"] > 100000) & (df["Salary_USD"] <= 150000)])),
-        int(len(df[df["Salary_USD"] > 150000]))
-    ]
-}
+INSIGHTS_DATASET = os.getenv("INSIGHTS_DATASET", "./Datasets/ai_job_market_insights.csv")
+INSIGHTS_CACHE_DIR = os.getenv("INSIGHTS_CACHE_DIR", ".cache/insights")
+INSIGHTS_MEMO_SIZE = int(os.getenv("INSIGHTS_MEMO_SIZE", "256"))
+# Bytes hashed at each end of the already-loaded prefix before trusting a grown file as an append
+INSIGHTS_FINGERPRINT_BYTES = int(os.getenv("INSIGHTS_FINGERPRINT_BYTES", str(1 << 20)))
 
-# Locations breakdown
-locations = {
-    "labels": df["Location"].value_counts().index.tolist()[:10] if "Location" in df.columns else [],
-    "data": df["Location"].value_counts().values.tolist()[:10] if "Location" in df.columns else []
+SALARY = "Salary_USD"
+SKILL_COLUMNS = ("Skills", "Required_Skills")
+# query parameter -> column
+FILTERS = {"industry": "Industry", "location": "Location", "year": "Year"}
+BREAKDOWNS = {  # chart name -> (x column, colour column)
+    "remote_friendly": ("Industry", "Remote_Friendly"),
+    "automation_risk": ("Industry", "Automation_Risk"),
+    "ai_adoption": ("Industry", "AI_Adoption_Level"),
+    "job_growth": ("Job_Title", "Job_Growth_Projection"),
 }
+SALARY_BANDS = ["0-50k", "50k-100k", "100k-150k", "150k+"]
+SALARY_EDGES = [-np.inf, 50000, 100000, 150000, np.inf]
+BAND = "Salary_Band"
 
-# Trends
-trends = {
-    "labels": df["Year"].value_counts().sort_index().index.tolist() if "Year" in df.columns else [],
-    "data": df["Year"].value_counts().sort_index().values.tolist() if "Year" in df.columns else []
-}
 
+def columnar_format() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:  # in requirements.txt; pickle keeps the categoricals too
+        return "pickle"
 
-output = {
-    "charts": charts,
-    "stats": stats,
-    "skills": skills,
-    "salary_range": salary_range,
-    "locations": locations,
-    "trends": trends
-}
+
+def prefix_fingerprint(path: str, size: int) -> Optional[str]:
+    """
+    sha256 over the first and last INSIGHTS_FINGERPRINT_BYTES of the file's first
+    `size` bytes (all of them for smaller files); None if the file is shorter now.
+    """
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < size:
+            return None
+        window = INSIGHTS_FINGERPRINT_BYTES
+        if size <= 2 * window:
+            digest.update(f.read(size))
+        else:
+            digest.update(f.read(window))
+            f.seek(size - window)
+            digest.update(f.read(window))
+    return digest.hexdigest()
+
+
+def prepare(frame: pd.DataFrame) -> pd.DataFrame:
+    """Types raw CSV rows: text columns become categoricals, salary a float, Year an integer."""
+    frame = frame.copy()
+    if SALARY not in frame.columns:
+        raise ValueError(f"Rows need a '{SALARY}' column")
+    frame[SALARY] = pd.to_numeric(frame[SALARY], errors="coerce")
+    if "Year" in frame.columns:  # "2024", not "2024.0", whatever the CSV's inferred dtype
+        frame["Year"] = pd.to_numeric(frame["Year"], errors="coerce").astype("Int64")
+    for col in frame.columns:
+        if col != SALARY:
+            frame[col] = frame[col].astype("string").fillna("Unknown").astype("category")
+    frame[BAND] = pd.cut(frame[SALARY], SALARY_EDGES, labels=SALARY_BANDS).cat.set_categories(SALARY_BANDS)
+    return frame
+
+
+MEASURES = ("jobs", "salary_sum", "salary_n")
+
+
+def cube_specs(columns) -> Dict[str, List[str]]:
+    """
+    Group keys per cube: the filter columns plus what one view groups by. Columns
+    no view uses (e.g. Company_Size) are left out, and no cube crosses two views.
+    """
+    filters = [c for c in FILTERS.values() if c in columns]
+    specs = {"base": filters + [BAND]}  # totals, salary bands, locations, industries, trends
+    skill_col = next((c for c in SKILL_COLUMNS if c in columns), None)
+    if skill_col:
+        specs["skills"] = filters + [skill_col]
+    if "Job_Title" in columns:
+        specs["salary_by_job"] = filters + ["Job_Title"]
+    for name, (x, colour) in BREAKDOWNS.items():
+        if x in columns and colour in columns:
+            specs[name] = list(dict.fromkeys(filters + [x, colour]))
+    return specs
+
+
+def aggregate(frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    cube = frame.groupby(keys, observed=True, sort=False).agg(
+        jobs=(SALARY, "size"), salary_sum=(SALARY, "sum"), salary_n=(SALARY, "count"))
+    return cube.reset_index()
+
+
+def build_cubes(frame: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    return {name: aggregate(frame, keys) for name, keys in cube_specs(frame.columns).items()}
+
+
+def top(counts: pd.Series, n: Optional[int] = None) -> Dict[str, list]:
+    counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+    if n:
+        counts = counts.head(n)
+    return {"labels": [str(k) for k in counts.index], "data": [int(v) for v in counts.values]}
+
+
+class InsightsEngine:
+    """
+    Loads the dataset once, keeps the aggregate cubes in memory and memoizes
+    filtered views. Rows appended to the CSV (or through `append`) are folded in
+    incrementally; any other change to the file triggers a full reload. A grown
+    file only counts as appended to if the bytes already loaded still match
+    their fingerprint, so a rewrite that happens to be longer is reloaded too.
+    """
+
+    def __init__(self, path: str = INSIGHTS_DATASET, cache_dir: str = INSIGHTS_CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.format = columnar_format()
+        self.frame: Optional[pd.DataFrame] = None
+        self.cubes: Dict[str, pd.DataFrame] = {}
+        self.version = 0
+        self.reloads = 0
+        self.appends = 0
+        self._signature = None  # (mtime_ns, size) of the CSV the frame reflects
+        self._fingerprint = None  # prefix_fingerprint of those `size` bytes
+        self._memo = TTLCache(max_entries=INSIGHTS_MEMO_SIZE, name="insights")
+        self._lock = threading.RLock()
+
+    # ---------------- Loading ----------------
+    @property
+    def _cache_path(self) -> str:
+        name = os.path.splitext(os.path.basename(self.path))[0]
+        return os.path.join(self.cache_dir, f"{name}.{self.format}")
+
+    def _read_cache(self):
+        try:
+            with open(self._cache_path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if self.format == "parquet":
+                frame = pd.read_parquet(self._cache_path)
+            else:
+                frame = pd.read_pickle(self._cache_path)
+            return frame, tuple(meta["signature"]), meta.get("fingerprint")
+        except (OSError, ValueError, KeyError):
+            return None, None, None
+
+    def _write_cache(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.format == "parquet":
+                self.frame.to_parquet(self._cache_path, index=False)
+            else:
+                self.frame.to_pickle(self._cache_path)
+            with open(self._cache_path + ".json", "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.abspath(self.path), "signature": list(self._signature),
+                           "fingerprint": self._fingerprint}, f)
+        except OSError as e:
+            print(f"[WARN] Could not write insights cache: {e}")
+
+    def _read_tail(self, offset: int, end: int) -> pd.DataFrame:
+        """Rows written to the CSV between bytes `offset` and `end`, parsed with the file's header."""
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            f.seek(offset)
+            tail = f.read(end - offset)
+        return pd.read_csv(io.BytesIO(header + tail))
+
+    def _is_append(self, size: int, fingerprint: Optional[str], new_size: int) -> bool:
+        return (fingerprint is not None and size < new_size
+                and prefix_fingerprint(self.path, size) == fingerprint)
+
+    def _load(self, signature):
+        frame, cached, fingerprint = self._read_cache()
+        if frame is not None and cached == signature and fingerprint is not None:
+            source = "cache"
+        elif frame is not None and self._is_append(cached[1], fingerprint, signature[1]):
+            tail = prepare(self._read_tail(cached[1], signature[1]))[frame.columns]
+            categories = self._union(frame, tail)
+            frame = pd.concat([self._align(frame, categories), self._align(tail, categories)], ignore_index=True)
+            source = "cache + appended rows"
+        else:
+            frame = prepare(pd.read_csv(self.path))
+            source = "csv"
+        self.frame, self.cubes = frame, build_cubes(frame)
+        self._signature = signature
+        self._fingerprint = fingerprint if source == "cache" else prefix_fingerprint(self.path, signature[1])
+        self.version += 1
+        self.reloads += 1
+        self._memo.clear()
+        if source != "cache":
+            self._write_cache()
+        print(f"[INFO] Loaded {len(frame)} job rows from {source} ({self._groups()} aggregate groups)")
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            if self._signature is not None and self._is_append(self._signature[1], self._fingerprint, signature[1]):
+                self._fold(prepare(self._read_tail(self._signature[1], signature[1])))
+                self._signature = signature
+                self._fingerprint = prefix_fingerprint(self.path, signature[1])
+                self._write_cache()
+            else:
+                self._load(signature)
+
+    # ---------------- Incremental updates ----------------
+    @staticmethod
+    def _align(frame: pd.DataFrame, categories: Dict[str, pd.Index]) -> pd.DataFrame:
+        """Re-codes the categorical columns of `frame` onto `categories` (a superset of their values)."""
+        frame = frame.copy()
+        for col, cats in categories.items():
+            if col in frame.columns and not frame[col].cat.categories.equals(cats):
+                frame[col] = frame[col].cat.set_categories(cats)
+        return frame
+
+    @staticmethod
+    def _union(*frames: pd.DataFrame) -> Dict[str, pd.Index]:
+        categories = {}
+        for col in frames[0].columns:
+            if col not in (SALARY, BAND):
+                categories[col] = frames[0][col].cat.categories
+                for frame in frames[1:]:
+                    # sorted, like the categories read_csv infers, so a fold matches a fresh load
+                    categories[col] = categories[col].union(frame[col].cat.categories)
+        return categories
+
+    def _fold(self, rows: pd.DataFrame):
+        rows = rows[self.frame.columns]
+        categories = self._union(self.frame, rows)
+        rows, frame = self._align(rows, categories), self._align(self.frame, categories)
+        added = build_cubes(rows)
+        cubes = {}
+        for name, cube in self.cubes.items():
+            keys = [c for c in cube.columns if c not in MEASURES]
+            merged = pd.concat([self._align(cube, categories), added[name]], ignore_index=True)
+            cubes[name] = merged.groupby(keys, observed=True, sort=False).sum().reset_index()
+        self.cubes = cubes
+        self.frame = pd.concat([frame, rows], ignore_index=True)
+        self.version += 1
+        self.appends += 1
+        self._memo.clear()
+        print(f"[INFO] Folded {len(rows)} appended job rows ({len(self.frame)} total)")
+
+    def append(self, rows: List[dict]) -> int:
+        """Appends rows to the CSV and folds them into the aggregates without a reload."""
+        with self._lock:
+            self.refresh()
+            raw = pd.DataFrame(rows)
+            columns = [c for c in self.frame.columns if c != BAND]
+            missing = set(columns) - set(raw.columns)
+            if missing:
+                raise ValueError(f"Rows are missing columns: {', '.join(sorted(missing))}")
+            self._fold(prepare(raw[columns]))
+            with open(self.path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() and (f.seek(-1, os.SEEK_END), f.read(1))[1] not in (b"\n", b"\r"):
+                    f.write(b"\n")
+                f.write(raw[columns].to_csv(index=False, header=False).encode("utf-8"))
+            stat = os.stat(self.path)
+            self._signature = (stat.st_mtime_ns, stat.st_size)
+            self._fingerprint = prefix_fingerprint(self.path, stat.st_size)
+            self._write_cache()
+            return len(self.frame)
+
+    # ---------------- Queries ----------------
+    def filters(self) -> List[str]:
+        self.refresh()
+        return [name for name, col in FILTERS.items() if col in self.frame.columns]
+
+    def query(self, industry: Optional[str] = None, location: Optional[str] = None,
+              year: Optional[int] = None) -> dict:
+        self.refresh()
+        version, cubes = self.version, self.cubes
+        requested = {"industry": industry, "location": location, "year": year}
+        active = {name: value for name, value in requested.items() if value is not None}
+        for name in active:
+            if FILTERS[name] not in cubes["base"].columns:
+                raise ValueError(f"The dataset has no {FILTERS[name]} column to filter by {name}")
+
+        key = (version,) + tuple(sorted((n, str(v)) for n, v in active.items()))
+        hit, result = self._memo.get(key)
+        if hit:
+            return result
+
+        filtered = {}
+        for cube_name, cube in cubes.items():
+            mask = np.ones(len(cube), dtype=bool)
+            for name, value in active.items():
+                mask &= (cube[FILTERS[name]].astype(str) == str(value)).to_numpy()
+            filtered[cube_name] = cube[mask]
+        result = self._summarize(filtered, active)
+        self._memo.set(key, result)
+        return result
+
+    def _summarize(self, cubes: Dict[str, pd.DataFrame], active: dict) -> dict:
+        cube = cubes["base"]
+
+        def counts(col, source=cube):
+            return source.groupby(col, observed=True)["jobs"].sum()
+
+        jobs = int(cube["jobs"].sum())
+        salary_n = int(cube["salary_n"].sum())
+        skill_cube = cubes.get("skills")
+        skill_col = next((c for c in SKILL_COLUMNS if skill_cube is not None and c in skill_cube.columns), None)
+        skills = top(counts(skill_col, skill_cube), 10) if skill_col and jobs else {"labels": [], "data": []}
+
+        avg_salary = pd.Series(dtype="float64")
+        if "salary_by_job" in cubes:
+            by_title = cubes["salary_by_job"].groupby("Job_Title", observed=True)[["salary_sum", "salary_n"]].sum()
+            by_title = by_title[by_title["salary_n"] > 0]
+            avg_salary = (by_title["salary_sum"] / by_title["salary_n"]).sort_values(ascending=False)
+
+        breakdowns = {}
+        for name, (x, colour) in BREAKDOWNS.items():
+            if name not in cubes:
+                continue
+            table = cubes[name].pivot_table(index=x, columns=colour, values="jobs", aggfunc="sum",
+                                     fill_value=0, observed=True)
+            breakdowns[name] = {
+                "labels": [str(v) for v in table.index],
+                "series": {str(c): [int(v) for v in table[c]] for c in table.columns},
+            }
+
+        bands = counts(BAND).reindex(SALARY_BANDS, fill_value=0)
+        trends = counts("Year").sort_index() if "Year" in cube.columns else pd.Series(dtype="int64")
+        return {
+            "filters": {name: str(value) for name, value in active.items()},
+            "stats": {
+                "total_jobs": jobs,
+                "top_skill": skills["labels"][0] if skills["labels"] else "N/A",
+                "average_salary": round(float(cube["salary_sum"].sum()) / salary_n, 2) if salary_n else None,
+            },
+            "skills": skills,
+            "salary_range": {"labels": SALARY_BANDS, "data": [int(v) for v in bands.values]},
+            "locations": top(counts("Location"), 10) if "Location" in cube.columns else {"labels": [], "data": []},
+            "trends": {"labels": [int(y) for y in trends.index], "data": [int(v) for v in trends.values]},
+            "salary_by_job": {"labels": [str(t) for t in avg_salary.index],
+                              "data": [round(float(v), 2) for v in avg_salary.values]},
+            "jobs_by_industry": top(counts("Industry")) if "Industry" in cube.columns else {"labels": [], "data": []},
+            **breakdowns,
+        }
+
+    def _groups(self) -> int:
+        return sum(len(cube) for cube in self.cubes.values())
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "cache": self._cache_path,
+            "format": self.format,
+            "rows": len(self.frame) if self.frame is not None else 0,
+            "groups": self._groups(),
+            "version": self.version,
+            "reloads": self.reloads,
+            "appends": self.appends,
+            "memo": self._memo.stats(),
+        }
+
+
+# ---------------- charts.json ----------------
+def build_charts(engine: InsightsEngine) -> dict:
+    """The static Plotly charts, drawn from the engine's aggregates (raw rows only for the distributions)."""
+    import plotly.express as px
+    import plotly.io as pio
+
+    insights = engine.query()
+    df = engine.frame
+    charts = {}
+
+    # 1. Average Salary by Job Title
+    salary_by_job = pd.DataFrame({"Job_Title": insights["salary_by_job"]["labels"],
+                                  SALARY: insights["salary_by_job"]["data"]})
+    fig1 = px.bar(salary_by_job, x="Job_Title", y=SALARY, title="Average Salary by Job Title", text_auto=True)
+    fig1.update_traces(textposition="outside")
+    fig1.update_layout(xaxis_tickangle=-45, showlegend=False)
+    charts["salary_by_job"] = pio.to_html(fig1, full_html=False, include_plotlyjs='cdn')
+
+    # 2. Jobs by Industry
+    industries = insights["jobs_by_industry"]
+    fig2 = px.pie(names=industries["labels"], values=industries["data"],
+                  title="Distribution of Jobs by Industry", hole=0.3)
+    fig2.update_traces(textinfo='percent+label')
+    charts["jobs_by_industry"] = pio.to_html(fig2, full_html=False, include_plotlyjs=False)
+
+    # 3. Salary Distribution
+    fig3 = px.histogram(df, x=SALARY, nbins=30, title="Salary Distribution", marginal="box")
+    fig3.update_traces(marker_color="indianred")
+    charts["salary_distribution"] = pio.to_html(fig3, full_html=False, include_plotlyjs=False)
+
+    # 4. Salary vs AI Adoption
+    fig4 = px.box(df, x="AI_Adoption_Level", y=SALARY, title="Salary vs AI Adoption Level by Company")
+    charts["salary_vs_ai"] = pio.to_html(fig4, full_html=False, include_plotlyjs=False)
+
+    # 5-8. Grouped counts
+    titles = {
+        "remote_friendly": "Remote-Friendly Jobs by Industry",
+        "automation_risk": "Automation Risk factor for jobs",
+        "ai_adoption": "Automation Adoption factor for jobs",
+        "job_growth": "Job Growth Projections",
+    }
+    for name, (x, colour) in BREAKDOWNS.items():
+        if name not in insights:
+            continue
+        long = pd.DataFrame([(label, series, count)
+                             for series, data in insights[name]["series"].items()
+                             for label, count in zip(insights[name]["labels"], data)],
+                            columns=[x, colour, "count"])
+        options = {"color_discrete_map": {"High": "#1f77b4", "Moderate": "#ff7f0e", "Low": "#2ca02c"}} \
+            if name == "job_growth" else {}
+        fig = px.bar(long, x=x, y="count", color=colour, title=titles[name], barmode="group",
+                     text_auto=True, **options)
+        fig.update_layout(xaxis_tickangle=-45)
+        charts[name] = pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+    return {
+        "charts": charts,
+        **{k: insights[k] for k in ("stats", "skills", "salary_range", "locations", "trends")},
+    }
 
 
-with open("charts.json", "w") as f:
-    json.dump(output, f)
+if __name__ == "__main__":
+    output = build_charts(InsightsEngine())
+    with open("charts.json", "w") as f:
+        json.dump(output, f)
+    print(f"[INFO] Wrote {len(output['charts'])} charts to charts.json")
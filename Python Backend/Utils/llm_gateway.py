@@ -0,0 +1,418 @@
+# llm_gateway.py
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from Utils import metrics
+from Utils.rate_limit import backoff_delay, is_rate_limit_error, retry_after_seconds
+
+# groq (default) | fake -- the fake backend answers locally, for offline throughput tests
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-120b")
+# Point at an OpenAI-compatible stub (see Benchmarks/stub_servers.py) instead of api.groq.com
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+# Per-process budgets; 0 disables a limit. Off by default: the provider's limit is per
+# account, so set these from the plan's quota divided by the number of worker processes
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "1024"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "300"))
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM provider circuit is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+# ---------------- Rate limiting ----------------
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` units per second up to `per_minute`. `reserve`
+    debits immediately and returns how long the caller must wait, so sync and
+    async callers share one bucket and are served in arrival order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        # Positive refunds an over-estimate, negative charges an under-estimate
+        if self.rate > 0:
+            with self._lock:
+                self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets plus a shared pause after a 429."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        return max(delay, self.paused_until - time.monotonic())
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+# ---------------- Circuit breaker ----------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive provider failures and rejects calls for
+    `cooldown` seconds; then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.trial_in_flight):
+                raise CircuitOpenError(max(1.0, self.cooldown - (time.monotonic() - self.opened_at)))
+            if state == "half-open":
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self.trial_in_flight = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        # The call was cancelled before the provider answered: let the next caller be the trial
+        with self._lock:
+            self.trial_in_flight = False
+
+
+def is_retryable(exc: Exception) -> bool:
+    if is_rate_limit_error(exc) or isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status >= 500
+    # groq/httpx timeout and connection errors carry no status code
+    name = type(exc).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+# ---------------- Fake backend ----------------
+FAKE_RESUME = {
+    "name": "Jane Doe", "contact_no": "+1 555 0100", "email": "jane.doe@example.com",
+    "linkedin_profile_link": "https://linkedin.com/in/janedoe", "skills": ["Python", "FastAPI", "SQL"],
+    "experience": "4 years as a backend developer", "total_experience_years": 4.0,
+    "projects_built": ["Job portal API"], "achievements_like_awards_and_certifications": ["AWS Certified Developer"],
+}
+FAKE_SCORE = {
+    "scores": {"technical_skills": 24, "experience": 18, "certifications": 10, "projects": 11, "soft_skills": 10},
+    "total_score": 73, "strengths_summary": "Solid backend experience with the requested stack.",
+    "improvement_areas": ["Cloud depth", "Testing", "Leadership"],
+    "suggestions": ["Add metrics to projects", "List cloud work", "Mention code reviews"],
+}
+
+
+def fake_reply(prompt: str) -> str:
+    """Canned answers shaped like the ones each agent parses."""
+    if "structured JSON from resumes" in prompt:
+        return json.dumps(FAKE_RESUME)
+    if "recruitment expert" in prompt:
+        return json.dumps(FAKE_SCORE)
+    if "mock interview questions" in prompt:
+        match = re.search(r"exactly (\d+)", prompt)
+        n = int(match.group(1)) if match else 5
+        return json.dumps([f"Fake technical question {i + 1}?" for i in range(n)])
+    return "This is a canned answer from the fake LLM backend."
+
+
+class FakeChatModel(BaseChatModel):
+    latency_ms: float = LLM_FAKE_LATENCY_MS
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        text = fake_reply(prompt)
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                 "total_tokens": (len(prompt) + len(text)) // 4}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        text = self._result(messages).generations[0].message.content
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)]
+        for piece in pieces:
+            time.sleep(self.latency_ms / 1000 / max(1, len(pieces)))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+
+# ---------------- Gateway ----------------
+def build_chat_model() -> BaseChatModel:
+    if LLM_BACKEND == "fake":
+        return FakeChatModel()
+    import httpx
+    from langchain_groq import ChatGroq
+
+    limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+    return ChatGroq(
+        model=LLM_MODEL,
+        api_key=os.getenv("GROQ_API_KEY"),
+        base_url=GROQ_BASE_URL,
+        timeout=LLM_TIMEOUT,
+        max_retries=0,  # retries are ours, so they respect the shared limiter
+        http_client=httpx.Client(limits=limits, timeout=LLM_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT),
+    )
+
+
+def prompt_text(input: LanguageModelInput) -> str:
+    if isinstance(input, str):
+        return input
+    if isinstance(input, PromptValue):
+        return input.to_string()
+    return "\n".join(str(getattr(m, "content", m)) for m in input)
+
+
+class LLMGateway(Runnable[LanguageModelInput, BaseMessage]):
+    """
+    One chat model per process behind a shared limiter, retry policy and circuit
+    breaker. Drop-in for ChatGroq in LCEL chains (`prompt | llm | parser`), with
+    invoke / ainvoke / stream / astream.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.limiter = RateLimiter(LLM_RPM, LLM_TPM)
+        self.breaker = CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN)
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rate_limited": 0, "rejected": 0,
+                         "input_tokens": 0, "output_tokens": 0, "throttled_seconds": 0.0}
+        self._counters_lock = threading.Lock()
+
+    @property
+    def model(self) -> BaseChatModel:
+        # Built on first use, so importing an agent needs no API key
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = build_chat_model()
+        return self._model
+
+    def _count(self, **deltas):
+        # Updated from llm_pool threads and the event loop at once
+        with self._counters_lock:
+            for name, delta in deltas.items():
+                self.counters[name] += delta
+
+    # ---- policy shared by every entry point ----
+    def _admit(self, input: LanguageModelInput):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count(rejected=1)
+            raise
+        estimate = len(prompt_text(input)) // 4 + LLM_COMPLETION_TOKEN_ESTIMATE
+        delay = self.limiter.reserve(estimate)
+        self._count(throttled_seconds=delay)
+        return estimate, delay
+
+    def _on_success(self, message: BaseMessage, estimate: int):
+        self.breaker.record_success()
+        usage = getattr(message, "usage_metadata", None) or {}
+        self._count(calls=1, input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+        metrics.record_llm_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        if usage.get("total_tokens"):
+            self.limiter.tokens.adjust(estimate - usage["total_tokens"])
+
+    def _on_error(self, exc: Exception, attempt: int) -> float:
+        """Returns the delay before the next attempt, or re-raises."""
+        if not is_retryable(exc):
+            self.breaker.record_success()  # the provider answered; the request was bad
+            raise exc
+        self.breaker.record_failure()
+        if is_rate_limit_error(exc):
+            self._count(rate_limited=1)
+            wait = retry_after_seconds(exc) or backoff_delay(attempt, base=1.0)
+            # Everyone in the process backs off, not just this caller
+            self.limiter.pause(wait)
+        else:
+            wait = backoff_delay(attempt)
+        if attempt >= LLM_MAX_RETRIES:
+            self._count(failures=1)
+            raise exc
+        self._count(retries=1)
+        return wait
+
+    def _on_stream_error(self):
+        # After the first chunk a stream is not retried, but the failure still counts
+        self.breaker.record_failure()
+        self._count(failures=1)
+
+    def _on_stream_end(self, final: Optional[BaseMessage], estimate: int, answered: bool):
+        # Completed, or closed early by the caller (GeneratorExit) after the provider answered
+        if answered:
+            self._on_success(final or AIMessage(content=""), estimate)
+        else:
+            self.breaker.release_trial()
+
+    # ---- entry points ----
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            estimate, delay = self._admit(input)
+            time.sleep(delay)
+            try:
+                message = self.model.invoke(input, config, **kwargs)
+            except Exception as e:
+                time.sleep(self._on_error(e, attempt))
+                continue
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+            self._on_success(message, estimate)
+            return message
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            estimate, delay = self._admit(input)
+            await asyncio.sleep(delay)
+            try:
+                message = await asyncio.wait_for(self.model.ainvoke(input, config, **kwargs), LLM_TIMEOUT)
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt))
+                continue
+            except BaseException:  # cancelled
+                self.breaker.release_trial()
+                raise
+            self._on_success(message, estimate)
+            return message
+
+    def stream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> Iterator[BaseMessage]:
+        # Retried only until the first chunk; after that a failure surfaces to the caller
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            estimate, delay = self._admit(input)
+            time.sleep(delay)
+            started, done, failed, final = False, False, False, None
+            try:
+                for chunk in self.model.stream(input, config, **kwargs):
+                    started = True
+                    final = chunk if final is None else final + chunk
+                    yield chunk
+                done = True
+            except Exception as e:
+                failed = True
+                if started:
+                    self._on_stream_error()
+                    raise
+                wait = self._on_error(e, attempt)
+            finally:
+                if not failed:
+                    self._on_stream_end(final, estimate, started or done)
+            if done:
+                return
+            time.sleep(wait)
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessage]:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            estimate, delay = self._admit(input)
+            await asyncio.sleep(delay)
+            started, done, failed, final = False, False, False, None
+            try:
+                async for chunk in self.model.astream(input, config, **kwargs):
+                    started = True
+                    final = chunk if final is None else final + chunk
+                    yield chunk
+                done = True
+            except Exception as e:
+                failed = True
+                if started:
+                    self._on_stream_error()
+                    raise
+                wait = self._on_error(e, attempt)
+            finally:
+                if not failed:
+                    self._on_stream_end(final, estimate, started or done)
+            if done:
+                return
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {
+            "backend": LLM_BACKEND,
+            "model": LLM_MODEL,
+            "circuit": self.breaker.state,
+            "limits": {"rpm": LLM_RPM, "tpm": LLM_TPM},
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in counters.items()},
+        }
+
+
+_gateway = LLMGateway()
+
+
+def get_llm() -> LLMGateway:
+    """The process-wide gateway every agent shares."""
+    return _gateway
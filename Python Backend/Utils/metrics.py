@@ -0,0 +1,161 @@
+# metrics.py
+import os
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Adds a Server-Timing header (one entry per traced stage) to every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Span = (stage, wall_seconds, cpu_seconds)
+Span = Tuple[str, float, float]
+
+_current_stage = contextvars.ContextVar("current_stage", default="none")
+_request_spans: contextvars.ContextVar = contextvars.ContextVar("request_spans", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=STAGE_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                base = _label_text(self.labels, labels)
+                for bound, c in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {c}')
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{base}}} {round(total, 6)}")
+                lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name, self.help, self.labels = name, help, labels
+        self._series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._series.items()):
+                lines.append(f"{self.name}{{{_label_text(self.labels, labels)}}} {value}")
+        return lines
+
+
+stage_seconds = Histogram("companion_stage_seconds", "Wall time per agent node or pipeline stage", ("stage",))
+stage_cpu_seconds = Histogram("companion_stage_cpu_seconds", "CPU time of the executing thread per stage", ("stage",))
+llm_tokens = Counter("companion_llm_tokens_total", "LLM tokens by calling stage", ("stage", "kind"))
+cache_lookups = Counter("companion_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+REGISTRY = [stage_seconds, stage_cpu_seconds, llm_tokens, cache_lookups]
+
+
+# ---------------- Recording ----------------
+def record_span(stage: str, wall: float, cpu: float):
+    stage_seconds.observe((stage,), wall)
+    stage_cpu_seconds.observe((stage,), cpu)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, wall, cpu))
+
+
+@contextmanager
+def span(stage: str):
+    token = _current_stage.set(stage)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+        _current_stage.reset(token)
+
+
+def traced(stage: str):
+    """
+    Decorator for graph nodes and pipeline stages, sync or async. For async nodes
+    the CPU figure also includes whatever else ran on the loop thread meanwhile.
+    """
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_llm_usage(input_tokens: int, output_tokens: int):
+    stage = _current_stage.get()
+    llm_tokens.inc((stage, "prompt"), input_tokens)
+    llm_tokens.inc((stage, "completion"), output_tokens)
+
+
+def record_cache(cache: str, hit: bool, count: int = 1):
+    if count:
+        cache_lookups.inc((cache, "hit" if hit else "miss"), count)
+
+
+# ---------------- Requests and worker processes ----------------
+def start_request() -> List[Span]:
+    spans: List[Span] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def server_timing(spans: List[Span]) -> Optional[str]:
+    if not spans:
+        return None
+    return ", ".join(f"{stage};dur={wall * 1000:.1f}" for stage, wall, _ in spans)
+
+
+def collect_spans(fn, *args, **kwargs):
+    """Runs in a worker process: returns (result, spans) so the parent can merge them."""
+    spans = start_request()
+    return fn(*args, **kwargs), spans
+
+
+def merge_spans(spans: List[Span]):
+    for stage, wall, cpu in spans:
+        record_span(stage, wall, cpu)
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
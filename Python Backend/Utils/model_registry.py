@@ -0,0 +1,84 @@
+# model_registry.py
+import os
+import time
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+# One lazily-loaded instance per model per process, shared by every module
+# (API embeddings, sentiment, mock-interview similarity, ...).
+_loaders: Dict[str, Callable] = {}
+_instances: Dict[str, object] = {}
+_load_seconds: Dict[str, float] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+PROCESS_STARTED_AT = time.time()
+
+
+def register(name: str, loader: Callable):
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name: str):
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    if name not in _loaders:
+        raise KeyError(f"No model registered under '{name}'")
+    with _locks[name]:
+        # Another thread may have finished loading while we waited
+        if name not in _instances:
+            started = time.perf_counter()
+            _instances[name] = _loaders[name]()
+            _load_seconds[name] = round(time.perf_counter() - started, 3)
+            print(f"[INFO] Loaded model '{name}' in {_load_seconds[name]}s")
+    return _instances[name]
+
+
+def is_loaded(name: str) -> bool:
+    return name in _instances
+
+
+def warm_up(names: Optional[Iterable[str]] = None):
+    for name in names or list(_loaders):
+        try:
+            get(name)
+        except Exception as e:
+            print(f"[WARN] Warm-up of '{name}' failed: {e}")
+
+
+def rss_mb() -> Optional[float]:
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except ImportError:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def startup_report() -> dict:
+    return {
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - PROCESS_STARTED_AT, 3),
+        "rss_mb": rss_mb(),
+        "registered": sorted(_loaders),
+        "loaded": dict(_load_seconds),
+    }
+
+
+# ---------------- Default models ----------------
+# torch (default) | onnx | onnx-int8 -- the ONNX backends export the model on first load
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch").lower()
+
+def _load_minilm():
+    if ENCODER_BACKEND in ("onnx", "onnx-int8"):
+        from Utils.onnx_encoder import OnnxEncoder
+        return OnnxEncoder(quantized=ENCODER_BACKEND == "onnx-int8")
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+register("minilm", _load_minilm)
@@ -0,0 +1,174 @@
+# onnx_encoder.py
+import os
+import shutil
+import argparse
+import tempfile
+from typing import List, Union
+
+import numpy as np
+
+from Utils.file_lock import file_lock
+
+HF_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_models/all-MiniLM-L6-v2")
+MAX_SEQ_LENGTH = 256  # same limit SentenceTransformer applies for this model
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def model_path(model_dir: str, quantized: bool) -> str:
+    return os.path.join(model_dir, "model_int8.onnx" if quantized else "model.onnx")
+
+
+def export_minilm(model_dir: str = ONNX_MODEL_DIR, quantize: bool = True) -> str:
+    """
+    Exports the MiniLM transformer (without pooling) to ONNX with dynamic batch and
+    sequence axes, saves its tokenizer next to it and, optionally, an int8
+    dynamically-quantized copy (needs the `onnx` package). Returns the directory.
+
+    Runs under a file lock and writes into a scratch directory whose files are
+    moved in with os.replace, model files last, so concurrent cpu_pool workers
+    export once and never load a half-written model.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    with file_lock(os.path.join(model_dir, ".export.lock")):
+        fp32, int8 = model_path(model_dir, quantized=False), model_path(model_dir, quantized=True)
+        if os.path.exists(fp32) and (os.path.exists(int8) or not quantize):
+            return model_dir
+        scratch = tempfile.mkdtemp(prefix=".export-", dir=model_dir)
+        try:
+            if not os.path.exists(fp32):
+                _export_fp32(scratch)
+            if quantize and not os.path.exists(int8):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                source = fp32 if os.path.exists(fp32) else model_path(scratch, quantized=False)
+                quantize_dynamic(source, model_path(scratch, quantized=True), weight_type=QuantType.QInt8)
+            names = sorted(os.listdir(scratch), key=lambda name: name.endswith(".onnx"))
+            for name in names:
+                os.replace(os.path.join(scratch, name), os.path.join(model_dir, name))
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return model_dir
+
+
+def _export_fp32(model_dir: str):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_NAME)
+    model = AutoModel.from_pretrained(HF_MODEL_NAME).eval()
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in INPUT_NAMES),
+            model_path(model_dir, quantized=False),
+            input_names=INPUT_NAMES,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES + ["last_hidden_state"]},
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(model_dir)
+
+
+class OnnxEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode on top of ONNX Runtime:
+    mean pooling + L2 normalization (the same head all-MiniLM-L6-v2 uses),
+    length-sorted batches padded only to the longest text in each batch.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, quantized: bool = False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        path = model_path(model_dir, quantized)
+        if not os.path.exists(path):
+            export_minilm(model_dir, quantize=quantized)  # locked: the first worker exports, the rest wait
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self.quantized = quantized
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feed = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: feed[name] for name in self.input_names})[0]
+        mask = feed["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               convert_to_tensor: bool = False, **kwargs):
+        # Outputs are always normalized, as with the torch pipeline's Normalize module
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 384), dtype=np.float32)
+
+        # Sorting by length keeps per-batch padding small
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        embeddings = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            batch = self._encode_batch([texts[i] for i in idx]).astype(np.float32)
+            if embeddings.shape[1] == 0:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            embeddings[idx] = batch
+
+        result = embeddings[0] if single else embeddings
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(result)
+        return result
+
+
+def parity_check(texts: List[str], quantized: bool = False, model_dir: str = ONNX_MODEL_DIR) -> dict:
+    """Cosine agreement between the ONNX encoder and the torch SentenceTransformer baseline."""
+    from sentence_transformers import SentenceTransformer
+
+    baseline = SentenceTransformer("all-MiniLM-L6-v2").encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    candidate = OnnxEncoder(model_dir, quantized=quantized).encode(texts)
+    cosines = (baseline * candidate).sum(axis=1)
+    return {
+        "backend": "onnx-int8" if quantized else "onnx",
+        "texts": len(texts),
+        "min_cosine": round(float(cosines.min()), 6),
+        "mean_cosine": round(float(cosines.mean()), 6),
+        "max_deviation": round(float(1.0 - cosines.min()), 6),
+    }
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Export all-MiniLM-L6-v2 to ONNX and check parity")
+    cli.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+    cli.add_argument("--no-quantize", action="store_true")
+    cli.add_argument("--parity", action="store_true", help="compare against the torch baseline")
+    args = cli.parse_args()
+
+    export_minilm(args.model_dir, quantize=not args.no_quantize)
+    print(f"[INFO] Exported ONNX model to {args.model_dir}")
+    if args.parity:
+        samples = [
+            "Senior Python developer with FastAPI and PostgreSQL experience",
+            "Looking for a data scientist familiar with PyTorch and MLOps",
+            "The interview process was smooth and the recruiter was helpful.",
+            "short",
+            "Responsible for designing, building and maintaining scalable microservices " * 10,
+        ]
+        print(parity_check(samples, quantized=False, model_dir=args.model_dir))
+        if not args.no_quantize:
+            print(parity_check(samples, quantized=True, model_dir=args.model_dir))
@@ -0,0 +1,22 @@
+# rate_limit.py
+import random
+from typing import Optional
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(exc).lower()
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    # Full jitter: spreads retries from concurrent callers instead of synchronizing them
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
@@ -0,0 +1,300 @@
+# vector_index.py
+import os
+import json
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from Utils.file_lock import file_lock
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12, None)
+
+
+def _spherical_kmeans(sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        filled = np.bincount(assign, minlength=nlist) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids
+
+
+class VectorIndex:
+    """
+    Persistent id -> unit-vector index for cosine top-k search.
+
+    Vectors live in an append-only float32 file read through a memory map, and
+    an append-only `ids.log` records which row holds each id. Rows are never
+    rewritten: upserting an existing id appends a new row and re-points the id.
+    Writers from several worker processes are serialized with flock and take
+    row numbers from the vectors file size, so a crash between the two appends
+    leaves an orphaned row, never a misaligned one. Compaction writes a new
+    generation of both files and switches the `CURRENT` pointer.
+
+    Below `ann_threshold` live rows, search is an exact matrix-vector product;
+    above it, an IVF structure (spherical k-means lists, `nprobe` probed) keeps
+    the scanned fraction small. The IVF is built in a background thread. Until
+    the first build finishes search stays exact, and rows appended after a
+    build (updated ids included) are scanned exactly until they exceed 20% of
+    the index and trigger a rebuild that assigns them to cells.
+    """
+
+    def __init__(self, directory: str, dim: int = 384, ann_threshold: int = 20000, nprobe: int = 8):
+        self.directory = directory
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        os.makedirs(directory, exist_ok=True)
+        self.current_path = os.path.join(directory, "CURRENT")
+        self.lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.RLock()
+        self._ann = None
+        self._ann_thread: Optional[threading.Thread] = None
+        self._load()
+
+    # ---------------- persistence ----------------
+    def _paths(self, generation: int) -> Tuple[str, str]:
+        if generation == 0:
+            return os.path.join(self.directory, "vectors.f32"), os.path.join(self.directory, "ids.log")
+        return (os.path.join(self.directory, f"vectors.{generation}.f32"),
+                os.path.join(self.directory, f"ids.{generation}.log"))
+
+    def _read_generation(self) -> int:
+        try:
+            with open(self.current_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _load(self):
+        # A compaction in another process may delete the generation we just read; retry
+        for _ in range(5):
+            self.generation = self._read_generation()
+            self.vectors_path, self.log_path = self._paths(self.generation)
+            self.row_ids: List[Optional[str]] = []
+            self.row_of = {}
+            self._log_offset = 0
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)
+            self.alive = np.zeros(0, dtype=bool)
+            try:
+                self._read_log()
+                break
+            except FileNotFoundError:
+                continue
+        self._ann = None
+
+    def _read_log(self):
+        """Applies log entries written since the last read (by any process)."""
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            if self.generation == 0:
+                return
+            raise
+        if size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read()
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            op, row, item_id = json.loads(line)
+            if op == "+":
+                previous = self.row_of.get(item_id)
+                if previous is not None:
+                    self.row_ids[previous] = None
+                while len(self.row_ids) <= row:
+                    self.row_ids.append(None)
+                self.row_ids[row] = item_id
+                self.row_of[item_id] = row
+            elif item_id in self.row_of:
+                self.row_ids[self.row_of.pop(item_id)] = None
+        self._log_offset += len(complete)
+        self._remap()
+
+    def _remap(self):
+        rows = len(self.row_ids)
+        # Vectors are written before their log entries, so every logged row is on disk
+        if rows > len(self.matrix):
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        self.alive = np.array([i is not None for i in self.row_ids], dtype=bool)
+
+    def _sync(self):
+        # Another worker process may have written to or compacted the index
+        if self._read_generation() != self.generation:
+            self._load()
+            return
+        try:
+            self._read_log()
+        except FileNotFoundError:
+            self._load()
+
+    def _append(self, ids: List[str], vectors: np.ndarray):
+        # Caller holds the flock
+        row_bytes = self.dim * 4
+        with open(self.vectors_path, "ab") as f:
+            first = f.tell() // row_bytes
+            if f.tell() != first * row_bytes:
+                f.truncate(first * row_bytes)  # torn row left by a crashed writer
+            f.write(vectors.astype(np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_log([["+", first + i, item_id] for i, item_id in enumerate(ids)])
+
+    def _write_log(self, entries):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---------------- mutation ----------------
+    def upsert(self, items: Iterable[Tuple[str, Iterable[float]]]) -> int:
+        # Last write wins when the same id appears twice in one call
+        items = {str(i): v for i, v in items}
+        if not items:
+            return 0
+        ids = list(items)
+        vectors = _normalize(np.asarray(list(items.values()), dtype=np.float32))
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[-1]}")
+
+        with self._lock, file_lock(self.lock_path):
+            self._sync()
+            self._append(ids, vectors)
+            self._read_log()
+            self._maybe_compact()
+        return len(items)
+
+    def delete(self, item_ids: Iterable[str]) -> int:
+        with self._lock, file_lock(self.lock_path):
+            self._sync()
+            log = [["-", self.row_of[i], i] for i in dict.fromkeys(map(str, item_ids)) if i in self.row_of]
+            if log:
+                self._write_log(log)
+                self._read_log()
+            self._maybe_compact()
+        return len(log)
+
+    def _maybe_compact(self):
+        if len(self.row_ids) > 1000 and self.alive.sum() < 0.75 * len(self.row_ids):
+            self._compact()
+
+    def compact(self):
+        """Rewrites the files without deleted or superseded rows."""
+        with self._lock, file_lock(self.lock_path):
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        # Caller holds the flock
+        keep = np.flatnonzero(self.alive)
+        generation = self.generation + 1
+        vectors_path, log_path = self._paths(generation)
+        vectors = np.array(self.matrix[keep]) if len(keep) else np.empty((0, self.dim), np.float32)
+        vectors.astype(np.float32).tofile(vectors_path)
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(["+", row, self.row_ids[i]]) + "\n" for row, i in enumerate(keep)))
+        tmp = self.current_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(generation))
+        os.replace(tmp, self.current_path)
+        # Readers still mapping the old vectors keep their pages; new loads see the new generation
+        for path in (self.vectors_path, self.log_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._load()
+
+    # ---------------- search ----------------
+    def _build_ann(self, generation: int, matrix: np.ndarray, alive: np.ndarray):
+        # Rows are immutable, so the snapshot can be read without holding the lock
+        rows = len(alive)
+        live = np.flatnonzero(alive)
+        nlist = max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(matrix[rng.choice(live, min(len(live), nlist * 64), replace=False)])
+        centroids = _spherical_kmeans(sample, nlist)
+
+        assign = np.empty(rows, dtype=np.int64)
+        for start in range(0, rows, 65536):
+            chunk = np.asarray(matrix[start:min(rows, start + 65536)])
+            assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+        ann = {"centroids": centroids, "order": order, "offsets": offsets, "rows": rows}
+        with self._lock:
+            if self.generation == generation:
+                self._ann = ann
+
+    def build_ann(self, wait: bool = True):
+        """Starts an IVF build in the background (if none is running); `wait` blocks until it is done."""
+        with self._lock:
+            if self._ann_thread is None or not self._ann_thread.is_alive():
+                self._ann_thread = threading.Thread(
+                    target=self._build_ann, args=(self.generation, self.matrix, self.alive.copy()),
+                    name="vector-index-ivf", daemon=True,
+                )
+                self._ann_thread.start()
+            thread = self._ann_thread
+        if wait:
+            thread.join()
+
+    def _candidate_rows(self, query: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        if int(self.alive.sum()) < self.ann_threshold:
+            return None
+        ann = self._ann
+        if ann is None or len(self.row_ids) - ann["rows"] > 0.2 * ann["rows"]:
+            self.build_ann(wait=False)
+        if ann is None:
+            return None  # exact scan until the first build is ready
+        probes = np.argsort(-(ann["centroids"] @ query))[:nprobe]
+        lists = [ann["order"][ann["offsets"][c]:ann["offsets"][c + 1]] for c in probes]
+        fresh = np.arange(ann["rows"], len(self.row_ids))
+        return np.concatenate(lists + [fresh])
+
+    def search(self, vector, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        if query.shape[-1] != self.dim:
+            raise ValueError(f"Expected a vector of dimension {self.dim}, got {query.shape[-1]}")
+
+        with self._lock:
+            self._sync()
+            if not len(self.matrix):
+                return []
+            rows = self._candidate_rows(query, nprobe or self.nprobe)
+            if rows is None:
+                scores = np.asarray(self.matrix) @ query
+                rows = np.arange(len(scores))
+            else:
+                scores = np.asarray(self.matrix[rows]) @ query
+            alive = self.alive[rows]
+            rows, scores = rows[alive], scores[alive]
+            if not len(rows):
+                return []
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.row_ids[rows[i]], float(scores[i])) for i in top]
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.row_of),
+            "rows": len(self.row_ids),
+            "dim": self.dim,
+            "generation": self.generation,
+            "ann": self._ann is not None,
+            "ann_building": self._ann_thread is not None and self._ann_thread.is_alive(),
+            "ann_lists": len(self._ann["centroids"]) if self._ann is not None else 0,
+        }
@@ -0,0 +1,165 @@
+# video_analysis.py
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Sampling rate and inference width for the fast path; 0 disables either one,
+# so VIDEO_SAMPLE_FPS=0 VIDEO_MAX_WIDTH=0 reproduces the full-frame baseline.
+VIDEO_SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", "5"))
+VIDEO_MAX_WIDTH = int(os.getenv("VIDEO_MAX_WIDTH", "320"))
+# Recordings longer than this are split into chunks analysed in worker processes
+VIDEO_CHUNK_SECONDS = float(os.getenv("VIDEO_CHUNK_SECONDS", "30"))
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_chunk_pool = None
+
+
+def _get_chunk_pool() -> ProcessPoolExecutor:
+    # Created on first use and kept, so FaceMesh workers are not re-spawned per answer
+    global _chunk_pool
+    if _chunk_pool is None:
+        _chunk_pool = ProcessPoolExecutor(VIDEO_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _chunk_pool
+
+
+def frame_scores(landmarks) -> Tuple[float, float]:
+    """Eye-contact and smile scores of one face, as the interview has always computed them."""
+    lm = landmarks.landmark
+    left_ratio = abs(lm[33].x - lm[133].x)
+    right_ratio = abs(lm[362].x - lm[263].x)
+    eye = max(0.0, 1.0 - (left_ratio + right_ratio) / 0.2)
+    smile = abs(lm[61].x - lm[291].x) * 10.0
+    return eye, smile
+
+
+def summarize(eye_scores: List[float], smile_scores: List[float]) -> Dict[str, float]:
+    eye = float(np.clip(np.mean(eye_scores) if eye_scores else 0.0, 0.0, 1.0))
+    smile = float(np.clip(np.mean(smile_scores) if smile_scores else 0.0, 0.0, 1.0))
+    confidence = float(np.clip((eye + smile) / 2.0, 0.0, 1.0))
+    return {"eye_contact_ratio": round(eye, 2), "facial_expression_score": round(smile, 2),
+            "confidence_score": round(confidence, 2)}
+
+
+def probe(path: str) -> Tuple[int, float]:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    frames, fps = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 20.0
+    cap.release()
+    return frames, fps
+
+
+def analyze_segment(path: str, start: int, end: Optional[int], step: int = 1,
+                    max_width: int = 0) -> Tuple[List[float], List[float], int]:
+    """
+    Runs FaceMesh on every `step`-th frame in [start, end). Skipped frames are only
+    grabbed (never converted), sampled frames are downscaled to `max_width` before
+    the RGB conversion, and the decode/resize/RGB buffers are reused across frames.
+    Returns (eye_scores, smile_scores, frames_analyzed).
+    """
+    import cv2
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1)
+    eye_scores, smile_scores = [], []
+    frame = small = rgb = None
+    index, analyzed = start, 0
+
+    try:
+        while end is None or index < end:
+            if (index - start) % step:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            index += 1
+
+            height, width = frame.shape[:2]
+            if max_width and width > max_width:
+                size = (max_width, int(height * max_width / width))
+                small = cv2.resize(frame, size, dst=small if small is not None and small.shape[1::-1] == size else None,
+                                   interpolation=cv2.INTER_AREA)
+            else:
+                small = frame
+            rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb if rgb is not None and rgb.shape == small.shape else None)
+
+            results = face_mesh.process(rgb)
+            analyzed += 1
+            if results.multi_face_landmarks:
+                eye, smile = frame_scores(results.multi_face_landmarks[0])
+                eye_scores.append(eye)
+                smile_scores.append(smile)
+    finally:
+        cap.release()
+        face_mesh.close()
+    return eye_scores, smile_scores, analyzed
+
+
+def analyze_video(path: str, sample_fps: float = VIDEO_SAMPLE_FPS, max_width: int = VIDEO_MAX_WIDTH,
+                  chunk_seconds: float = VIDEO_CHUNK_SECONDS, workers: int = VIDEO_WORKERS) -> Dict[str, float]:
+    total, fps = probe(path)
+    step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+
+    chunk = int(chunk_seconds * fps)
+    if workers > 1 and chunk > 0 and total > chunk:
+        # Chunk boundaries are multiples of `step`, so sampling matches a single pass
+        chunk = max(step, chunk - chunk % step)
+        pool = _get_chunk_pool()
+        futures = [pool.submit(analyze_segment, path, s, min(s + chunk, total), step, max_width)
+                   for s in range(0, total, chunk)]
+        parts = [f.result() for f in futures]
+    else:
+        parts = [analyze_segment(path, 0, None, step, max_width)]
+
+    eye_scores = [score for part in parts for score in part[0]]
+    smile_scores = [score for part in parts for score in part[1]]
+    return summarize(eye_scores, smile_scores)
+
+
+def analyze_video_baseline(path: str) -> Dict[str, float]:
+    """Every frame, full resolution, one process -- the original analysis."""
+    return analyze_video(path, sample_fps=0, max_width=0, chunk_seconds=0, workers=1)
+
+
+def compare_with_baseline(path: str, **kwargs) -> dict:
+    """Runs both paths on one recording and reports the speed-up and per-metric deltas."""
+    started = time.perf_counter()
+    baseline = analyze_video_baseline(path)
+    baseline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast = analyze_video(path, **kwargs)
+    fast_seconds = time.perf_counter() - started
+
+    return {
+        "frames": probe(path)[0],
+        "baseline_seconds": round(baseline_seconds, 3),
+        "fast_seconds": round(fast_seconds, 3),
+        "speedup": round(baseline_seconds / fast_seconds, 2) if fast_seconds else None,
+        "baseline": baseline,
+        "fast": fast,
+        "abs_delta": {k: round(abs(fast[k] - baseline[k]), 4) for k in baseline},
+    }
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Compare the sampled video analysis against the full-frame baseline")
+    cli.add_argument("video")
+    cli.add_argument("--sample-fps", type=float, default=VIDEO_SAMPLE_FPS)
+    cli.add_argument("--max-width", type=int, default=VIDEO_MAX_WIDTH)
+    cli.add_argument("--chunk-seconds", type=float, default=VIDEO_CHUNK_SECONDS)
+    cli.add_argument("--workers", type=int, default=VIDEO_WORKERS)
+    args = cli.parse_args()
+
+    print(compare_with_baseline(args.video, sample_fps=args.sample_fps, max_width=args.max_width,
+                                chunk_seconds=args.chunk_seconds, workers=args.workers))
@@ -1,23 +1,88 @@
 import os
-import shutil
 import json
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
-from Feedback.sentiment import analyze_feedback
+from Feedback.sentiment import analyze_feedback, analyze_feedback_batch
 
 
-from Agents.resume_agent import resume_agent
-from Agents.scoring_agent import scoring_agent
-from Agents.JobSearch_agent import job_search_agent
-from Agents.mock_interview import run_mock_interview
+from Agents.resume_agent import (
+    resume_agent, parse_resume_file, ocr_pdf_page, merge_page_text, content_hash,
+    PROMPT_VERSION as RESUME_PROMPT_VERSION, text_cache as resume_text_cache,
+    structured_cache as resume_structured_cache
+)
+from Agents.scoring_agent import PROMPT_VERSION, cached_score, score_cache, score_resume_uncached
+from Agents.JobSearch_agent import search_jobs_cached, search_stats, close_http_client
+from Agents.mock_interview import (
+    MAX_QUESTIONS, run_mock_interview, stream_questions_and_answers,
+    shutdown_pools as shutdown_interview_pools
+)
+from Utils.embedding_batcher import MicroBatcher
+from Utils.embedding_cache import EmbeddingCache
+from Utils.encoder import EMBED_MODEL_NAME, EMBED_MAX_BATCH, encode_texts
+from Utils.executors import PoolSaturatedError, llm_pool, cpu_pool
+from Utils.llm_gateway import CircuitOpenError, get_llm
+from Utils import model_registry, metrics
+from Utils.vector_index import VectorIndex
+from Utils.onnx_encoder import ONNX_MODEL_DIR, export_minilm
+from Utils.charts_store import ChartsStore, choose_encoding, is_not_modified
+from Utils.job_insights import InsightsEngine
+from Utils.rate_limit import backoff_delay
 
 
 
 app = FastAPI(title="Resume + Scoring API", version="1.0")
 
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class UploadLimitMiddleware:
+    """
+    Rejects multipart bodies over the upload cap before they are parsed: by
+    Content-Length up front, and by counting received bytes for chunked bodies.
+    Starlette spools the whole form (to a temp file above 1 MB) before the
+    endpoint runs, so the check cannot live in the endpoint.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers") or []) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        detail = f"Request body exceeds {self.max_bytes} bytes"
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            return await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+
+        received, rejected = 0, False
+
+        async def limited_receive():
+            # Past the cap: answer 413 ourselves and tell the app the client went away
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    rejected = True
+                    await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+            return {"type": "http.disconnect"} if rejected else message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        return await self.app(scope, limited_receive, guarded_send)
+
+# Added before CORS so CORSMiddleware wraps it and the 413 carries CORS headers
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -26,80 +91,306 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Spans from graph nodes, pool workers and pipeline stages collect into this list
+    spans = metrics.start_request()
+    response = await call_next(request)
+    header = metrics.server_timing(spans) if metrics.SERVER_TIMING else None
+    if header:
+        response.headers["Server-Timing"] = header
+    return response
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request, exc: PoolSaturatedError):
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request, exc: CircuitOpenError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(int(exc.retry_after))})
+
+# Comma-separated registry names to load before serving, e.g. "minilm,whisper"
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "").split(",") if m.strip()]
+
+@app.on_event("startup")
+async def warm_up_models():
+    if model_registry.ENCODER_BACKEND in ("onnx", "onnx-int8"):
+        # Export once, in a worker, before any request can make several workers race for it
+        try:
+            await cpu_pool.run(export_minilm, ONNX_MODEL_DIR, model_registry.ENCODER_BACKEND == "onnx-int8")
+        except Exception as e:
+            print(f"[WARN] ONNX export failed, workers will retry on first use: {e}")
+    if WARMUP_MODELS:
+        await asyncio.get_running_loop().run_in_executor(None, model_registry.warm_up, WARMUP_MODELS)
+    print(f"[INFO] Startup report: {model_registry.startup_report()}")
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    llm_pool.shutdown()
+    cpu_pool.shutdown()
+    shutdown_interview_pools()
+    await close_http_client()
+
 @app.get("/")
 def health():
     return {"status": "ok"}
 
+@app.get("/startup")
+def get_startup_report():
+    return model_registry.startup_report()
+
+@app.get("/pools")
+def get_pool_stats():
+    return {"llm": llm_pool.stats(), "cpu": cpu_pool.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm/stats")
+def get_llm_stats():
+    return get_llm().stats()
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    # The middleware bounds the whole body; this enforces the exact limit on the file part
+    content = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+    return content
+
+async def extract_resume_text(filename: str, content: bytes) -> dict:
+    extracted = await cpu_pool.run(parse_resume_file, content, filename, True)
+    pages = extracted.pop("pdf_pages", None)
+    if pages is not None:
+        # One cpu_pool task per scanned page rather than a nested process pool in each worker
+        scanned = [p["pdf_bytes"] for p in pages if "pdf_bytes" in p]
+        ocr_texts = await asyncio.gather(*(cpu_pool.run(ocr_pdf_page, b) for b in scanned))
+        extracted["resume_text"] = merge_page_text(pages, ocr_texts)
+    return {"file_type": extracted["file_type"], "resume_text": extracted.get("resume_text", "")}
 
 @app.post("/parse-resume/")
 async def parse_resume(file: UploadFile = File(...)):
     if not (file.filename.endswith(".pdf") or file.filename.endswith(".docx")):
         raise HTTPException(status_code=400, detail="Only PDF or DOCX files are supported")
 
-    temp_dir = "temp_uploads"
-    os.makedirs(temp_dir, exist_ok=True)
-    file_path = os.path.join(temp_dir, file.filename)
+    content = await read_upload(file)
+    digest = content_hash(content)
+    structured_key = (digest, RESUME_PROMPT_VERSION)
+
+    # Same bytes + same prompt: skip OCR and the LLM entirely
+    hit, structured = resume_structured_cache.get(structured_key)
+    if hit:
+        return JSONResponse(content=structured, headers={"X-Cache": "HIT"})
+
+    # Same bytes, new prompt (or earlier LLM failure): skip only OCR
+    hit, extracted = resume_text_cache.get(digest)
+    cache_status = "TEXT-HIT" if hit else "MISS"
+    if not hit:
+        extracted = await extract_resume_text(file.filename, content)
+        if extracted["file_type"] == "unsupported":
+            raise HTTPException(status_code=400, detail="Unsupported file type")
+        if extracted["resume_text"]:
+            resume_text_cache.set(digest, extracted)
+
+    if not extracted["resume_text"]:
+        return JSONResponse(content={"error": "No resume text"}, headers={"X-Cache": cache_status})
+
+    parsed = await llm_pool.run(resume_agent.invoke, dict(extracted))
+
+    if isinstance(parsed, str):
+        try:
+            parsed = json.loads(parsed)
+        except:
+            return JSONResponse(status_code=500, content={"error": "Failed to parse resume output."})
+
+    structured = parsed.get("structured_output", parsed)
+    if "error" not in structured:
+        resume_structured_cache.set(structured_key, structured)
+    return JSONResponse(content=structured, headers={"X-Cache": cache_status})
+
+@app.get("/parse-resume/stats")
+def get_parse_cache_stats():
+    return {
+        "prompt_version": RESUME_PROMPT_VERSION,
+        "text_cache": resume_text_cache.stats(),
+        "structured_cache": resume_structured_cache.stats()
+    }
 
-    try:
-        with open(file_path, "wb") as f_out:
-            shutil.copyfileobj(file.file, f_out)
+class ScoreResumeInput(BaseModel):
+    resume_json: Dict[str, Any]
+    job_description: str
+    bypass_cache: bool = False
 
-        parsed = resume_agent.invoke({"resume_file_path": file_path})
+class ScoreCandidate(BaseModel):
+    id: Optional[str] = None
+    resume_json: Dict[str, Any]
 
-        if isinstance(parsed, str):
-            try:
-                parsed = json.loads(parsed)
-            except:
-                return JSONResponse(status_code=500, content={"error": "Failed to parse resume output."})
+class BatchScoreInput(BaseModel):
+    job_description: str
+    resumes: List[ScoreCandidate]
+    bypass_cache: bool = False
 
-        return JSONResponse(content=parsed.get("structured_output", parsed))
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
 
-class ScoreResumeInput(BaseModel):
-    resume_json: Dict[str, Any]
-    job_description: str
+SCORE_BATCH_CONCURRENCY = int(os.getenv("SCORE_BATCH_CONCURRENCY", "8"))
+SCORE_BATCH_MAX = int(os.getenv("SCORE_BATCH_MAX", "500"))
+SCORE_MAX_RETRIES = int(os.getenv("SCORE_MAX_RETRIES", "3"))
 
-@app.post("/score-resume/")
-async def score_resume(input_data: ScoreResumeInput):
-    try:
-        payload = json.dumps({
-            "resume_json": input_data.resume_json,
-            "job_description": input_data.job_description
-        })
+def format_score(result: dict) -> dict:
+    parsed_result = result.get("parsed_result", {})
+    return {
+        "score": parsed_result.get("total_score", 0),
+        "feedback": result.get("feedback", ""),
+        "raw_output": parsed_result
+    }
 
-        result = scoring_agent(payload)
+def wants_cache_bypass(request: Request, flag: bool) -> bool:
+    return flag or "no-cache" in request.headers.get("cache-control", "").lower()
 
-        parsed_result = result.get("parsed_result", {})
-        feedback = result.get("feedback", "")
-        total_score = parsed_result.get("total_score", 0)
+async def embed_job_description(job_description: str) -> Optional[List[float]]:
+    # Through the embedding cache and cpu_pool, so the API process never loads an encoder
+    try:
+        return (await embed_texts([job_description.strip()]))[0]
+    except Exception as e:
+        print(f"[WARN] Job description embedding failed, scoring without similar evaluations: {e}")
+        return None
+
+async def run_scoring(resume_json: Dict[str, Any], job_description: str, bypass_cache: bool = False,
+                      embed_job=embed_job_description):
+    """(result, cache_status) like score_resume_cached; the job description is embedded only on a miss."""
+    if not bypass_cache:
+        cached = cached_score(resume_json, job_description)
+        if cached is not None:
+            return cached, "HIT"
+    job_embedding = await embed_job(job_description)
+    result = await llm_pool.run(score_resume_uncached, resume_json, job_description, job_embedding)
+    return result, "BYPASS" if bypass_cache else "MISS"
 
-        return JSONResponse(content={
-            "score": total_score,
-            "feedback": feedback,
-            "raw_output": parsed_result
-        })
+@app.post("/score-resume/")
+async def score_resume(input_data: ScoreResumeInput, request: Request):
+    try:
+        bypass = wants_cache_bypass(request, input_data.bypass_cache)
+        result, cache_status = await run_scoring(input_data.resume_json, input_data.job_description, bypass)
+        return JSONResponse(
+            content=format_score(result),
+            headers={"X-Cache": cache_status, "X-Prompt-Version": PROMPT_VERSION}
+        )
 
+    except (PoolSaturatedError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring failed: {e}")
 
 
+async def score_with_backoff(resume_json: Dict[str, Any], job_description: str, bypass_cache: bool = False,
+                             embed_job=embed_job_description):
+    # Only local admission is retried here; provider 429s and 5xx are retried by the LLM
+    # gateway, which also pauses every caller in the process after a 429
+    for attempt in range(SCORE_MAX_RETRIES + 1):
+        try:
+            return await run_scoring(resume_json, job_description, bypass_cache, embed_job)
+        except PoolSaturatedError:
+            if attempt == SCORE_MAX_RETRIES:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+
+@app.post("/score-resume/batch")
+async def score_resume_batch(input_data: BatchScoreInput, request: Request):
+    if len(input_data.resumes) > SCORE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {SCORE_BATCH_MAX} resumes per request")
+
+    semaphore = asyncio.Semaphore(SCORE_BATCH_CONCURRENCY)
+    bypass = wants_cache_bypass(request, input_data.bypass_cache)
+    # Embedded at most once per batch, and only if some candidate misses the score cache
+    embedding = None
+
+    def embed_job(job_description: str):
+        nonlocal embedding
+        if embedding is None:
+            embedding = asyncio.ensure_future(embed_job_description(job_description))
+        return asyncio.shield(embedding)
+
+    async def score_candidate(index: int, candidate: ScoreCandidate) -> dict:
+        candidate_id = candidate.id if candidate.id is not None else str(index)
+        async with semaphore:
+            try:
+                result, cache_status = await score_with_backoff(
+                    candidate.resume_json, input_data.job_description, bypass, embed_job
+                )
+                return {"id": candidate_id, "index": index, "status": "ok", "cache": cache_status,
+                        **format_score(result)}
+            except Exception as e:
+                return {"id": candidate_id, "index": index, "status": "error", "error": str(e)}
+
+    async def stream_results():
+        tasks = [asyncio.create_task(score_candidate(i, c)) for i, c in enumerate(input_data.resumes)]
+        try:
+            # Results are emitted in completion order, one JSON object per line
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        headers={"X-Prompt-Version": PROMPT_VERSION}
+    )
+
+@app.get("/score-resume/stats")
+def get_score_cache_stats():
+    return {"prompt_version": PROMPT_VERSION, "cache": score_cache.stats()}
+
+
 class SentimentInput(BaseModel):
     feedback: str
 
 @app.post("/analyze-feedback/")
 async def analyze_feedback_endpoint(input_data: SentimentInput):
     try:
-        score = analyze_feedback(input_data.feedback)
+        score = await cpu_pool.run(analyze_feedback, input_data.feedback)
         return JSONResponse(content={
             "feedback": input_data.feedback,
             "sentiment_score": score
         })
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sentiment analysis failed: {e}")
 
 
+class SentimentBatchInput(BaseModel):
+    feedbacks: List[str]
+    stream: bool = False
+
+
+SENTIMENT_MAX_TEXTS = int(os.getenv("SENTIMENT_MAX_TEXTS", "20000"))
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "256"))
+
+@app.post("/analyze-feedback/batch")
+async def analyze_feedback_batch_endpoint(input_data: SentimentBatchInput):
+    feedbacks = input_data.feedbacks
+    if len(feedbacks) > SENTIMENT_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {SENTIMENT_MAX_TEXTS} feedback texts per request")
+
+    if not input_data.stream:
+        results = await cpu_pool.run(analyze_feedback_batch, feedbacks)
+        return {"results": results}
+
+    async def stream_results():
+        # Large exports are scored chunk by chunk and flushed as NDJSON
+        for start in range(0, len(feedbacks), SENTIMENT_CHUNK_SIZE):
+            chunk = feedbacks[start:start + SENTIMENT_CHUNK_SIZE]
+            results = await cpu_pool.run(analyze_feedback_batch, chunk)
+            yield "".join(
+                json.dumps({"index": start + i, **result}) + "\n" for i, result in enumerate(results)
+            )
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 
 class TextInput(BaseModel):
     text: str
@@ -107,27 +398,196 @@ class TextInput(BaseModel):
 class EmbeddingResponse(BaseModel):
     embedding: List[float]
 
+class TextsInput(BaseModel):
+    texts: List[str]
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[List[float]]
+
+
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_TEXTS = int(os.getenv("EMBED_MAX_TEXTS", "1024"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "")
+
+# Concurrent /embed and /embed/batch calls are coalesced into one encode() per window
+embed_batcher = MicroBatcher(encode_texts, max_batch_size=EMBED_MAX_BATCH,
+                             max_wait_ms=EMBED_BATCH_WINDOW_MS, runner=cpu_pool.run)
+# Backend is part of the cache namespace: int8 vectors must not be served for fp32 requests
+embedding_cache = EmbeddingCache(f"{EMBED_MODEL_NAME}:{model_registry.ENCODER_BACKEND}", max_entries=EMBED_CACHE_SIZE, disk_dir=EMBED_CACHE_DIR or None)
+
+async def embedding_cache_io(fn, *args):
+    # The disk tier reads key files, takes an flock and fsyncs; none of that may run on the event loop
+    if embedding_cache.disk is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    vectors = await embedding_cache_io(embedding_cache.get_many, texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    metrics.record_cache("embedding", True, sum(v is not None for v in vectors))
+    metrics.record_cache("embedding", False, len(texts) - sum(v is not None for v in vectors))
+    if missing:
+        computed = await embed_batcher.submit_many(missing)
+        await embedding_cache_io(embedding_cache.put_many, missing, computed)
+        by_text = dict(zip(missing, computed))
+        vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+    return [v.tolist() for v in vectors]
+
+@app.post("/embed", response_model=EmbeddingResponse)
+async def get_embedding(data: TextInput):
+    vectors = await embed_texts([data.text])
+    return {"embedding": vectors[0]}
+
+@app.post("/embed/batch", response_model=BatchEmbeddingResponse)
+async def get_embeddings(data: TextsInput):
+    if len(data.texts) > EMBED_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {EMBED_MAX_TEXTS} texts per request")
+    vectors = await embed_texts(data.texts)
+    return {"embeddings": vectors}
+
+@app.get("/embed/stats")
+def get_embedding_stats():
+    return {
+        "batching": embed_batcher.stats(),
+        "cache": embedding_cache.stats()
+    }
+
+
+class IndexItem(BaseModel):
+    id: str
+    text: Optional[str] = None
+    vector: Optional[List[float]] = None
+
+class IndexUpsertInput(BaseModel):
+    items: List[IndexItem]
+
+class MatchInput(BaseModel):
+    namespace: str = "jobs"
+    text: Optional[str] = None
+    vector: Optional[List[float]] = None
+    k: int = Field(10, gt=0)
+    nprobe: Optional[int] = Field(None, gt=0)
+
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "vector_index")
+VECTOR_INDEX_NAMESPACES = {"jobs", "candidates"}
+VECTOR_ANN_THRESHOLD = int(os.getenv("VECTOR_ANN_THRESHOLD", "20000"))
+vector_indexes: Dict[str, VectorIndex] = {}
+
+def get_vector_index(namespace: str) -> VectorIndex:
+    if namespace not in VECTOR_INDEX_NAMESPACES:
+        raise HTTPException(status_code=404, detail=f"Unknown index '{namespace}'")
+    if namespace not in vector_indexes:
+        vector_indexes[namespace] = VectorIndex(
+            os.path.join(VECTOR_INDEX_DIR, namespace), ann_threshold=VECTOR_ANN_THRESHOLD
+        )
+    return vector_indexes[namespace]
+
+async def run_index_op(fn, *args):
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/index/{namespace}")
+async def upsert_index_items(namespace: str, input_data: IndexUpsertInput):
+    index = get_vector_index(namespace)
+    # Items sent without a vector are embedded here (through the embedding cache)
+    to_embed = [item for item in input_data.items if item.vector is None]
+    if any(not item.text for item in to_embed):
+        raise HTTPException(status_code=400, detail="Each item needs either 'vector' or 'text'")
+    embedded = await embed_texts([item.text for item in to_embed]) if to_embed else []
+    vectors = iter(embedded)
+    items = [(item.id, item.vector if item.vector is not None else next(vectors)) for item in input_data.items]
+
+    upserted = await run_index_op(index.upsert, items)
+    return {"upserted": upserted, "size": len(index)}
+
+@app.delete("/index/{namespace}/{item_id}")
+async def delete_index_item(namespace: str, item_id: str):
+    index = get_vector_index(namespace)
+    deleted = await run_index_op(index.delete, [item_id])
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"'{item_id}' is not in index '{namespace}'")
+    return {"deleted": item_id, "size": len(index)}
+
+@app.post("/match")
+async def match(input_data: MatchInput):
+    index = get_vector_index(input_data.namespace)
+    if input_data.vector is not None:
+        query = input_data.vector
+    elif input_data.text:
+        query = (await embed_texts([input_data.text]))[0]
+    else:
+        raise HTTPException(status_code=400, detail="Provide either 'text' or 'vector'")
+
+    results = await run_index_op(index.search, query, input_data.k, input_data.nprobe)
+    return {"matches": [{"id": item_id, "score": round(score, 6)} for item_id, score in results]}
+
+@app.get("/index/{namespace}/stats")
+def get_index_stats(namespace: str):
+    return get_vector_index(namespace).stats()
+
+
+CHARTS_PATH = os.getenv("CHARTS_PATH", "charts.json")
+CHARTS_MAX_AGE = int(os.getenv("CHARTS_MAX_AGE", "0"))
+charts_store = ChartsStore(CHARTS_PATH)
+
+def chart_response(request: Request, rep) -> Response:
+    headers = {
+        "ETag": rep.etag,
+        "Last-Modified": rep.last_modified,
+        "Cache-Control": f"public, max-age={CHARTS_MAX_AGE}, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if is_not_modified(rep, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), rep.bodies)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=rep.bodies[encoding], media_type="application/json", headers=headers)
 
-model = None
+@app.get("/charts")
+def get_charts(request: Request):
+    try:
+        return chart_response(request, charts_store.get())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{CHARTS_PATH} not found")
+    except ValueError:
+        raise HTTPException(status_code=503, detail=f"{CHARTS_PATH} is being rewritten, retry shortly")
+
+@app.get("/charts/stats")
+def get_charts_stats():
+    return charts_store.stats()
+
+@app.get("/charts/{name}")
+def get_chart(name: str, request: Request):
+    try:
+        rep = charts_store.get(name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{CHARTS_PATH} not found")
+    except ValueError:
+        raise HTTPException(status_code=503, detail=f"{CHARTS_PATH} is being rewritten, retry shortly")
+    if rep is None:
+        raise HTTPException(status_code=404, detail=f"Unknown chart '{name}'. Available: {', '.join(charts_store.names())}")
+    return chart_response(request, rep)
 
-def get_model():
-    global model
-    if model is None:
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-    return model
 
-@app.post("/embed")
-async def get_embedding(data: TextInput):
-    vector = get_model().encode(data.text).tolist()
-    return {"embedding": vector}
+insights_engine = InsightsEngine()
 
+@app.get("/insights")
+def get_insights(industry: Optional[str] = None, location: Optional[str] = None, year: Optional[int] = None):
+    try:
+        return insights_engine.query(industry=industry, location=location, year=year)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{insights_engine.path} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/charts")
-def get_charts():
-    with open("charts.json", "r") as f:
-        data = json.load(f)
-    return data
+@app.get("/insights/stats")
+def get_insights_stats():
+    return insights_engine.stats()
 
 class ResumeJobSearchRequest(BaseModel):
     name: str
@@ -155,26 +615,93 @@ class CustomPromptRequest(BaseModel):
 
 
 @app.post("/search_jobs", response_model=JobSearchResponse)
-def search_jobs(request: CustomPromptRequest):
+async def search_jobs(request: CustomPromptRequest, response: Response):
     try:
-        query = request.custom_prompt
-        result = job_search_agent.invoke({"query": query})
-        jobs = result.get("formatted_jobs", [])
+        jobs, cache_status = await search_jobs_cached(request.custom_prompt)
+        response.headers["X-Cache"] = cache_status
         return {"jobs": jobs}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/search_jobs/stats")
+def get_search_stats():
+    return search_stats()
+
 
 
 class InterviewRequest(BaseModel):
     job_id: int
     job_desc: str
 
+class InterviewQuestionsRequest(BaseModel):
+    job_desc: str
+    n: int = MAX_QUESTIONS
+
+@app.post("/interview/questions")
+async def interview_questions(request: InterviewQuestionsRequest):
+    """
+    NDJSON stream: one {"index", "question"} line per question as soon as the LLM
+    has written it, then one {"index", "model_answer"} line per answer in the
+    order they finish (answers are generated concurrently in the background).
+    """
+    if not request.job_desc.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    n = max(1, min(request.n, 20))
+    loop = asyncio.get_running_loop()
+    pairs: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        for pair in stream_questions_and_answers(request.job_desc.strip(), n):
+            loop.call_soon_threadsafe(pairs.put_nowait, pair)
+
+    # The question stream runs on llm_pool, so it is bounded and a full pool is a 429
+    producer = asyncio.ensure_future(llm_pool.run(produce))
+
+    async def next_pair():
+        getter = asyncio.ensure_future(pairs.get())
+        await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+        if not pairs.empty():
+            return pairs.get_nowait()
+        producer.result()  # re-raises the stream's error
+        return None
+
+    # Waiting for the first question here lets pool saturation and an open circuit map to 429/503
+    try:
+        first = await next_pair()
+    except (PoolSaturatedError, CircuitOpenError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Question generation failed: {e}")
+
+    async def answer_line(index: int, future) -> dict:
+        try:
+            return {"index": index, "model_answer": await asyncio.wrap_future(future)}
+        except Exception as e:
+            return {"index": index, "error": str(e)}
+
+    async def stream_lines():
+        answers, pair = [], first
+        try:
+            while pair is not None:
+                question, future = pair
+                answers.append(asyncio.ensure_future(answer_line(len(answers), future)))
+                yield json.dumps({"index": len(answers) - 1, "question": question}) + "\n"
+                pair = await next_pair()
+        except Exception as e:
+            yield json.dumps({"error": f"Question generation failed: {e}"}) + "\n"
+        for finished in asyncio.as_completed(answers):
+            yield json.dumps(await finished) + "\n"
+
+    return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
+
 @app.post("/start_interview/")
 async def start_interview(request: InterviewRequest):
     try:
 
-        result = run_mock_interview(request.job_desc)
+        result = await llm_pool.run(run_mock_interview, request.job_desc)
         final_overall = result.get("final_overall", {})
         qa_results = result.get("qa_results", [])
 
@@ -184,6 +711,8 @@ async def start_interview(request: InterviewRequest):
             "final_overall": final_overall
         })
 
+    except (PoolSaturatedError, CircuitOpenError):
+        raise
     except Exception as e:
         return JSONResponse(
             content={"status": "error", "message": str(e)},
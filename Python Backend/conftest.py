@@ -0,0 +1,2 @@
+# conftest.py
+# Lives at the backend root so tests import `Utils.*` / `Agents.*` the same way app.py does.
@@ -0,0 +1,149 @@
+import gzip
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as backend
+from Utils.charts_store import ChartsStore, Representation, choose_encoding, is_not_modified
+
+CHARTS = {"salary": "<div>salary</div>", "skills": "<div>skills ✓</div>"}
+
+
+def write_charts(path, text, mtime=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def charts(monkeypatch, tmp_path):
+    path = tmp_path / "charts.json"
+    write_charts(path, json.dumps(CHARTS), mtime=1_700_000_000)
+    store = ChartsStore(str(path))
+    monkeypatch.setattr(backend, "charts_store", store)
+    return path, store, TestClient(backend.app)
+
+
+# ---------------- Encoding negotiation ----------------
+@pytest.mark.parametrize("header, expected", [
+    ("", "identity"),
+    ("gzip", "gzip"),
+    ("gzip, deflate", "gzip"),
+    ("br, gzip", "br"),
+    ("BR;q=0.5, gzip;q=1.0", "br"),
+    ("*", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0.0", "identity"),
+    ("deflate", "identity"),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, {"identity": b"", "gzip": b"", "br": b""}) == expected
+
+
+def test_choose_encoding_skips_unavailable_brotli():
+    assert choose_encoding("br, gzip", {"identity": b"", "gzip": b""}) == "gzip"
+    assert choose_encoding("br", {"identity": b"", "gzip": b""}) == "identity"
+
+
+def test_endpoint_serves_negotiated_encoding(charts):
+    path, store, client = charts
+    rep = store.get()
+
+    plain = client.get("/charts", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == rep.bodies["identity"]
+    assert plain.json() == CHARTS
+
+    zipped = client.get("/charts", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["vary"]
+    assert zipped.json() == CHARTS
+    assert gzip.decompress(rep.bodies["gzip"]) == rep.bodies["identity"]
+
+
+def test_endpoint_serves_brotli_when_available(charts):
+    brotli = pytest.importorskip("brotli")
+    path, store, client = charts
+    response = client.get("/charts", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(store.get().bodies["br"]) == store.get().bodies["identity"]
+
+
+# ---------------- Conditional requests ----------------
+def test_is_not_modified():
+    rep = Representation(CHARTS, 1_700_000_000)
+    assert is_not_modified(rep, rep.etag, None)
+    assert is_not_modified(rep, f'"other", W/{rep.etag}', None)
+    assert is_not_modified(rep, "*", None)
+    assert not is_not_modified(rep, '"other"', None)
+    assert is_not_modified(rep, None, rep.last_modified)
+    assert not is_not_modified(rep, None, "Tue, 14 Nov 2023 22:13:19 GMT")
+    assert not is_not_modified(rep, None, "not a date")
+    # If-None-Match wins over If-Modified-Since
+    assert not is_not_modified(rep, '"other"', rep.last_modified)
+
+
+def test_if_none_match_returns_304(charts):
+    path, store, client = charts
+    first = client.get("/charts")
+    etag = first.headers["etag"]
+
+    again = client.get("/charts", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    one = client.get("/charts/salary")
+    assert one.json() == {"salary": CHARTS["salary"]}
+    assert one.headers["etag"] != etag
+    assert client.get("/charts/salary", headers={"If-None-Match": one.headers["etag"]}).status_code == 304
+
+
+def test_etag_changes_when_the_file_does(charts):
+    path, store, client = charts
+    etag = client.get("/charts").headers["etag"]
+
+    write_charts(path, json.dumps({**CHARTS, "roles": "<div>roles</div>"}), mtime=1_700_000_100)
+
+    response = client.get("/charts", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "roles" in response.json()
+
+
+# ---------------- Torn rewrites ----------------
+def test_torn_rewrite_keeps_serving_the_previous_version(charts):
+    path, store, client = charts
+    good = client.get("/charts")
+
+    write_charts(path, json.dumps(CHARTS)[:-10], mtime=1_700_000_100)
+    torn = client.get("/charts")
+    assert torn.status_code == 200
+    assert torn.headers["etag"] == good.headers["etag"]
+    assert torn.json() == CHARTS
+    assert store.reloads == 1
+
+    write_charts(path, json.dumps({"salary": "<div>new</div>"}), mtime=1_700_000_200)
+    fixed = client.get("/charts")
+    assert fixed.json() == {"salary": "<div>new</div>"}
+    assert store.reloads == 2
+
+
+def test_torn_file_before_any_good_version_is_503(monkeypatch, tmp_path):
+    path = tmp_path / "charts.json"
+    write_charts(path, '{"salary": "<div>')
+    monkeypatch.setattr(backend, "charts_store", ChartsStore(str(path)))
+    client = TestClient(backend.app)
+
+    assert client.get("/charts").status_code == 503
+    assert client.get("/charts/salary").status_code == 503
+
+
+def test_missing_file_and_unknown_chart_are_404(charts, monkeypatch, tmp_path):
+    path, store, client = charts
+    assert client.get("/charts/nope").status_code == 404
+
+    monkeypatch.setattr(backend, "charts_store", ChartsStore(str(tmp_path / "missing.json")))
+    assert client.get("/charts").status_code == 404
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from Utils.embedding_batcher import MicroBatcher
+
+
+def test_results_follow_submission_order_across_batches():
+    calls = []
+
+    def encode(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(encode, max_batch_size=4, max_wait_ms=20)
+        singles = [batcher.submit(i) for i in range(10)]
+        many = batcher.submit_many(list(range(100, 107)))
+        return await asyncio.gather(*singles), await many, batcher
+
+    singles, many, batcher = asyncio.run(main())
+    assert singles == [i * 10 for i in range(10)]
+    assert many == [i * 10 for i in range(100, 107)]
+    assert all(len(batch) <= 4 for batch in calls)
+    assert sum(len(batch) for batch in calls) == 17
+    assert batcher.stats()["batches"] == len(calls) < 17
+
+
+def test_encode_error_fails_every_request_in_the_batch_and_worker_recovers():
+    def encode(items):
+        if "bad" in items:
+            raise RuntimeError("encoder exploded")
+        return [item.upper() for item in items]
+
+    async def main():
+        batcher = MicroBatcher(encode, max_batch_size=8, max_wait_ms=20)
+        failed = await asyncio.gather(batcher.submit("a"), batcher.submit("bad"), batcher.submit("c"),
+                                      return_exceptions=True)
+        return failed, await batcher.submit_many(["x", "y"])
+
+    failed, recovered = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) and str(r) == "encoder exploded" for r in failed)
+    assert recovered == ["X", "Y"]
+
+
+def test_cancelled_request_is_dropped_before_encoding():
+    seen = []
+
+    def encode(items):
+        seen.extend(items)
+        return items
+
+    async def main():
+        batcher = MicroBatcher(encode, max_batch_size=8, max_wait_ms=50)
+        abandoned = asyncio.ensure_future(batcher.submit("gone"))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        kept = await batcher.submit("kept")
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+        return kept
+
+    assert asyncio.run(main()) == "kept"
+    assert seen == ["kept"]
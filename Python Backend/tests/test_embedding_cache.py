@@ -0,0 +1,82 @@
+import os
+import zlib
+import multiprocessing
+
+import numpy as np
+
+from Utils.embedding_cache import DiskTier, EmbeddingCache, cache_key
+
+
+def vector_for(key: str, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(zlib.crc32(key.encode())).standard_normal(dim).astype(np.float32)
+
+
+def write_keys(directory: str, worker: int, count: int):
+    tier = DiskTier(directory)
+    for start in range(0, count, 5):
+        keys = [f"w{worker}-{i}" for i in range(start, start + 5)]
+        tier.put_many([(k, vector_for(k)) for k in keys])
+
+
+def test_disk_tier_survives_reload(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    tier.put_many([(k, vector_for(k)) for k in ("a", "b", "c")])
+    tier.put_many([("a", vector_for("other")), ("d", vector_for("d"))])  # existing keys are kept
+
+    reloaded = DiskTier(str(tmp_path))
+    assert len(reloaded) == 4
+    for key in "abcd":
+        np.testing.assert_array_equal(reloaded.get(key), vector_for(key))
+    assert reloaded.get("missing") is None
+
+
+def test_disk_tier_sees_rows_written_by_another_instance(tmp_path):
+    reader = DiskTier(str(tmp_path))
+    writer = DiskTier(str(tmp_path))
+    writer.put_many([("a", vector_for("a"))])
+    np.testing.assert_array_equal(reader.get("a"), vector_for("a"))
+
+
+def test_torn_row_and_orphaned_vector_are_recovered(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    tier.put_many([("a", vector_for("a"))])
+    # A crashed writer: half a row on disk and a key line that points past the file
+    with open(tier.vectors_path, "ab") as f:
+        f.write(b"\0" * 10)
+    with open(tier.keys_path, "ab") as f:
+        f.write(b"ghost 1\n")
+
+    reloaded = DiskTier(str(tmp_path))
+    assert reloaded.get("ghost") is None
+    reloaded.put_many([("b", vector_for("b"))])
+    assert os.path.getsize(tier.vectors_path) == 2 * 8 * 4
+    again = DiskTier(str(tmp_path))
+    np.testing.assert_array_equal(again.get("a"), vector_for("a"))
+    np.testing.assert_array_equal(again.get("b"), vector_for("b"))
+
+
+def test_concurrent_writer_processes_never_misalign_keys(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=write_keys, args=(str(tmp_path), w, 40)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    tier = DiskTier(str(tmp_path))
+    assert len(tier) == 160
+    for key in tier.rows:
+        np.testing.assert_array_equal(tier.get(key), vector_for(key))
+
+
+def test_embedding_cache_reads_through_to_disk(tmp_path):
+    cache = EmbeddingCache("model/x", max_entries=1, disk_dir=str(tmp_path))
+    cache.put_many(["hello  world", "bye"], [vector_for("h"), vector_for("b")])
+
+    fresh = EmbeddingCache("model/x", max_entries=1, disk_dir=str(tmp_path))
+    hello, missing = fresh.get_many(["hello world", "unknown"])
+    np.testing.assert_array_equal(hello, vector_for("h"))
+    assert missing is None
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["misses"] == 1
+    assert cache_key("model/x", "a  b") == cache_key("model/x", " a b ")
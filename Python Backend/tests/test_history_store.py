@@ -0,0 +1,64 @@
+import json
+import sqlite3
+import multiprocessing
+
+import numpy as np
+
+from Utils.history_store import HistoryStore
+
+
+def append_records(path: str, legacy: str, worker: int, count: int, start):
+    store = HistoryStore(path, legacy_json=legacy, compact_every=0)
+    start.wait()  # every worker creates the schema and imports the legacy file at the same moment
+    for i in range(count):
+        store.append({"worker": worker, "i": i}, embedding=np.full(4, worker + 1, dtype=np.float32))
+
+
+def test_concurrent_processes_on_a_fresh_database(tmp_path):
+    path, legacy = str(tmp_path / "history.db"), tmp_path / "resume_history.json"
+    legacy.write_text(json.dumps([{"legacy": i} for i in range(5)]))
+
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Barrier(4)
+    workers = [ctx.Process(target=append_records, args=(path, str(legacy), w, 25, start)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    store = HistoryStore(path, legacy_json=str(legacy))
+    assert len(store) == 5 + 4 * 25
+    assert not legacy.exists() and (tmp_path / "resume_history.json.migrated").exists()
+    records = [json.loads(r[0]) for r in sqlite3.connect(path).execute("SELECT record FROM history")]
+    assert sum("legacy" in r for r in records) == 5
+    for w in range(4):
+        assert sorted(r["i"] for r in records if r.get("worker") == w) == list(range(25))
+
+
+def test_old_database_without_embeddings_is_migrated(tmp_path):
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, "
+                 "record TEXT NOT NULL)")
+    conn.execute("INSERT INTO history (created_at, record) VALUES (0, '{\"old\": true}')")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(path)
+    store.append({"new": True}, embedding=[1.0, 0.0])
+    assert store.last(5) == [{"old": True}, {"new": True}]
+    assert [r for _, r in store.similar([1.0, 0.1], k=3)] == [{"new": True}]
+
+
+def test_last_similar_and_compaction(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), max_rows=3, compact_every=0)
+    for i, vector in enumerate([[1, 0], [0, 1], [1, 1], [1, 0.1]]):
+        store.append({"i": i}, embedding=vector)
+    assert [r["i"] for r in store.last(2)] == [2, 3]
+    assert [r["i"] for _, r in store.similar([1, 0], k=2)] == [0, 3]
+
+    assert store.compact() == 1
+    assert len(store) == 3
+    assert [r["i"] for _, r in store.similar([1, 0], k=2)] == [3, 2]
+    assert [r for _, r in store.similar([1, 0], k=2, min_score=0.99)] == [{"i": 3}]
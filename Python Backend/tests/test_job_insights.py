@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from Utils.job_insights import InsightsEngine
+
+HEADER = "Job_Title,Industry,Location,Year,Salary_USD\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(HEADER + "Dev,Tech,NY,2024,90000\nOps,Tech,SF,2024,60000\n")
+    return path
+
+
+def rewrite(path, text):
+    time.sleep(0.01)  # a distinct mtime_ns even on coarse filesystems
+    path.write_text(text)
+
+
+def totals(engine, **filters):
+    result = engine.query(**filters)
+    return result["stats"]["total_jobs"], result["stats"]["average_salary"]
+
+
+def test_rows_appended_to_the_csv_are_folded_in(csv_path, tmp_path):
+    engine = InsightsEngine(str(csv_path), str(tmp_path / "cache"))
+    assert totals(engine) == (2, 75000.0)
+    with open(csv_path, "a") as f:
+        f.write("Dev,Finance,NY,2025,120000\n")
+
+    assert totals(engine) == (3, 90000.0)
+    assert totals(engine, industry="Finance") == (1, 120000.0)
+    assert engine.stats()["reloads"] == 1 and engine.stats()["appends"] == 1
+
+
+def test_append_matches_a_fresh_load(csv_path, tmp_path):
+    engine = InsightsEngine(str(csv_path), str(tmp_path / "cache"))
+    engine.query()
+    engine.append([{"Job_Title": "Analyst", "Industry": "Health", "Location": "LA", "Year": 2025,
+                    "Salary_USD": 30000}])
+    incremental = engine.query()
+
+    fresh = InsightsEngine(str(csv_path), str(tmp_path / "other-cache")).query()
+    assert incremental == fresh
+    assert incremental["stats"]["total_jobs"] == 3
+    with pytest.raises(ValueError):
+        engine.append([{"Job_Title": "No salary"}])
+
+
+def test_longer_rewrite_is_reloaded_not_folded(csv_path, tmp_path):
+    engine = InsightsEngine(str(csv_path), str(tmp_path / "cache"))
+    engine.query()
+    rewrite(csv_path, HEADER + "Mgr,Health,LA,2023,50000\nMgr,Health,LA,2023,70000\nDev,Tech,NY,2024,90000\n")
+
+    assert totals(engine) == (3, 70000.0)
+    assert engine.query()["jobs_by_industry"] == {"labels": ["Health", "Tech"], "data": [2, 1]}
+    assert engine.stats()["reloads"] == 2 and engine.stats()["appends"] == 0
+
+
+def test_restart_uses_the_cache_plus_appended_rows(csv_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    InsightsEngine(str(csv_path), cache_dir).query()
+    with open(csv_path, "a") as f:
+        f.write("Dev,Tech,NY,2025,30000\n")
+    restarted = InsightsEngine(str(csv_path), cache_dir)
+    assert totals(restarted) == (3, 60000.0)
+
+    rewrite(csv_path, HEADER + "A,B,C,2020,10\n" * 4)  # longer than the cached prefix, different bytes
+    assert totals(InsightsEngine(str(csv_path), cache_dir)) == (4, 10.0)
+
+
+def test_cubes_group_by_one_view_each_and_match_the_raw_rows(tmp_path):
+    path = tmp_path / "jobs.csv"
+    rows = [("Dev", "Tech", "NY", "Small", "Python", 100000), ("Dev", "Tech", "SF", "Large", "SQL", 80000),
+            ("Ops", "Finance", "NY", "Large", "Python", 60000), ("Ops", "Tech", "NY", "Small", "Go", 40000)]
+    path.write_text("Job_Title,Industry,Location,Company_Size,Required_Skills,Salary_USD\n"
+                    + "".join(",".join(map(str, r)) + "\n" for r in rows))
+    engine = InsightsEngine(str(path), str(tmp_path / "cache"))
+    result = engine.query(industry="Tech")
+
+    assert all("Company_Size" not in cube.columns for cube in engine.cubes.values())
+    assert "Job_Title" not in engine.cubes["skills"].columns
+    assert result["stats"] == {"total_jobs": 3, "top_skill": "Go", "average_salary": 73333.33}
+    assert result["salary_by_job"] == {"labels": ["Dev", "Ops"], "data": [90000.0, 40000.0]}
+    assert result["locations"] == {"labels": ["NY", "SF"], "data": [2, 1]}
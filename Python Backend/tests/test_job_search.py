@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+
+from Agents import JobSearch_agent
+from Benchmarks import stub_servers
+
+
+@pytest.fixture
+def serper(monkeypatch):
+    """serper_search wired to the in-process Serper stub, with no backoff sleeps."""
+    state = {"requests": 0, "in_flight": 0, "peak": 0, "fail_first": 0}
+
+    async def simulate_upstream():
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            state["in_flight"] -= 1
+        if state["requests"] <= state["fail_first"]:
+            return stub_servers.JSONResponse(status_code=503, content={"message": "stub failure"})
+        return None
+
+    monkeypatch.setattr(stub_servers, "simulate_upstream", simulate_upstream)
+    monkeypatch.setattr(JobSearch_agent, "SERPER_API_URL", "http://stub/search")
+    monkeypatch.setattr(JobSearch_agent, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(
+        JobSearch_agent, "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_servers.app)),
+    )
+    return state
+
+
+def test_results_across_pages_and_variants_are_deduplicated(serper, monkeypatch):
+    monkeypatch.setattr(JobSearch_agent, "SERPER_PAGES", 2)
+    monkeypatch.setattr(JobSearch_agent, "SERPER_QUERY_VARIANTS", ["{query}", "{query}"])
+
+    result = asyncio.run(JobSearch_agent.serper_search({"query": "python dev"}))
+
+    links = [JobSearch_agent.normalize_url(item["link"]) for item in result["raw_results"]]
+    # Duplicate variants collapse, and each pair of stub results shares a link modulo utm_* params
+    assert serper["requests"] == 2
+    assert len(links) == 10
+    assert len(set(links)) == len(links)
+
+
+def test_retries_503_until_success(serper, monkeypatch):
+    monkeypatch.setattr(JobSearch_agent, "SERPER_MAX_RETRIES", 2)
+    serper["fail_first"] = 2
+
+    result = asyncio.run(JobSearch_agent.serper_search({"query": "go dev"}))
+
+    assert serper["requests"] == 3
+    assert len(result["raw_results"]) == 5
+
+
+def test_gives_up_after_max_retries(serper, monkeypatch):
+    monkeypatch.setattr(JobSearch_agent, "SERPER_MAX_RETRIES", 1)
+    serper["fail_first"] = 10
+
+    result = asyncio.run(JobSearch_agent.serper_search({"query": "go dev"}))
+
+    assert serper["requests"] == 2
+    assert result["raw_results"] == []
+
+
+def test_page_fetches_run_concurrently_up_to_the_limit(serper, monkeypatch):
+    monkeypatch.setattr(JobSearch_agent, "SERPER_PAGES", 6)
+    monkeypatch.setattr(JobSearch_agent, "SERPER_CONCURRENCY", 3)
+
+    asyncio.run(JobSearch_agent.serper_search({"query": "rust dev"}))
+
+    assert serper["requests"] == 6
+    assert serper["peak"] == 3
+
+
+def test_invalid_json_gives_up_on_the_page(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, content=b"<html>not json</html>")
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await JobSearch_agent.fetch_page(client, "x", 0, asyncio.Semaphore(1))
+
+    monkeypatch.setattr(JobSearch_agent, "SERPER_API_URL", "http://stub/search")
+    assert asyncio.run(fetch()) == []
+    assert len(calls) == 1
@@ -0,0 +1,164 @@
+import time
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from Utils import llm_gateway
+from Utils.llm_gateway import CircuitBreaker, CircuitOpenError, LLMGateway, RateLimiter
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScriptedModel:
+    """Stands in for the chat model: pops one scripted outcome (an exception or a reply) per call."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def invoke(self, input, config=None, **kwargs):
+        reply = self._next()
+        return AIMessage(content=reply, usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5})
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return self.invoke(input, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        reply = self._next()
+        for i, piece in enumerate(reply.split(" ")):
+            if piece == "!boom":
+                raise ProviderError(503)
+            usage = {"input_tokens": 3, "output_tokens": 1, "total_tokens": 4} if i == 0 else None
+            yield AIMessageChunk(content=piece, usage_metadata=usage)
+
+    async def astream(self, input, config=None, **kwargs):
+        for chunk in self.stream(input, config, **kwargs):
+            yield chunk
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(llm_gateway, "backoff_delay", lambda attempt, base=0.5, cap=20.0: 0.0)
+    gw = LLMGateway()
+    gw.limiter = RateLimiter(0, 0)
+    gw.breaker = CircuitBreaker(threshold=3, cooldown=0.05)
+    return gw
+
+
+def half_open(gw: LLMGateway):
+    gw.breaker.opened_at = time.monotonic() - 1.0
+    gw.breaker.failures = gw.breaker.threshold
+    assert gw.breaker.state == "half-open"
+
+
+def test_retryable_errors_are_retried_and_bad_requests_are_not(gateway):
+    gateway._model = ScriptedModel(ProviderError(503), ProviderError(429), "fine")
+    assert gateway.invoke("hi").content == "fine"
+    assert gateway.stats()["retries"] == 2 and gateway.stats()["rate_limited"] == 1
+    assert gateway.stats()["input_tokens"] == 3
+
+    gateway._model = ScriptedModel(ProviderError(400))
+    with pytest.raises(ProviderError):
+        gateway.invoke("hi")
+    assert gateway._model.calls == 1
+    assert gateway.breaker.state == "closed"
+
+
+def test_breaker_opens_rejects_then_closes_after_a_successful_trial(gateway):
+    gateway._model = ScriptedModel(*[ProviderError(503)] * 3)
+    with pytest.raises(ProviderError):
+        gateway.invoke("hi")
+    assert gateway.breaker.state == "open"
+    assert gateway.stats()["failures"] == 1
+
+    with pytest.raises(CircuitOpenError):
+        gateway.invoke("hi")
+    assert gateway.stats()["rejected"] == 1
+
+    time.sleep(0.06)
+    assert gateway.breaker.state == "half-open"
+    gateway._model = ScriptedModel("back")
+    assert gateway.invoke("hi").content == "back"
+    assert gateway.breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_breaker(gateway):
+    half_open(gateway)
+    gateway._model = ScriptedModel(ProviderError(400))  # answered, so the trial counts as a success
+    with pytest.raises(ProviderError):
+        gateway.invoke("hi")
+    assert gateway.breaker.state == "closed"
+
+    half_open(gateway)
+    gateway._model = ScriptedModel(ProviderError(503))
+    with pytest.raises(CircuitOpenError):  # the retry is rejected by the reopened breaker
+        gateway.invoke("hi")
+    assert gateway.breaker.state == "open"
+
+
+def test_stream_closed_early_settles_the_half_open_trial(gateway):
+    half_open(gateway)
+    gateway._model = ScriptedModel("one two three")
+    for chunk in gateway.stream("hi"):
+        break  # mock_interview stops reading at the closing bracket
+    assert gateway.breaker.state == "closed"
+    assert gateway.stats()["calls"] == 1 and gateway.stats()["input_tokens"] == 3
+    assert [c.content for c in gateway.stream("hi")] == ["ok"]
+
+
+def test_async_stream_closed_early_settles_the_half_open_trial(gateway):
+    async def main():
+        half_open(gateway)
+        gateway._model = ScriptedModel("one two three")
+        stream = gateway.astream("hi")
+        async for chunk in stream:
+            break
+        await stream.aclose()
+        return [c.content async for c in gateway.astream("hi")]
+
+    assert asyncio.run(main()) == ["ok"]
+    assert gateway.breaker.state == "closed"
+
+
+def test_stream_retries_before_the_first_chunk_and_counts_failures_after(gateway):
+    gateway._model = ScriptedModel(ProviderError(503), "a b")
+    assert [c.content for c in gateway.stream("hi")] == ["a", "b"]
+    assert gateway.stats()["retries"] == 1
+
+    gateway._model = ScriptedModel("a !boom")
+    with pytest.raises(ProviderError):
+        list(gateway.stream("hi"))
+    assert gateway.stats()["failures"] == 1
+    assert gateway.breaker.failures == 1
+
+
+def test_cancelled_trial_lets_the_next_call_through(gateway):
+    class Hanging(ScriptedModel):
+        async def ainvoke(self, input, config=None, **kwargs):
+            await asyncio.sleep(10)
+
+    async def main():
+        half_open(gateway)
+        gateway._model = Hanging()
+        task = asyncio.ensure_future(gateway.ainvoke("hi"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        gateway._model = ScriptedModel("after")
+        return (await gateway.ainvoke("hi")).content
+
+    assert asyncio.run(main()) == "after"
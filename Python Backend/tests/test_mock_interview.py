@@ -0,0 +1,126 @@
+import json
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from Agents import mock_interview
+
+
+@pytest.fixture
+def interview(monkeypatch, tmp_path):
+    """run_mock_interview with the LLM, camera, microphone, models and uploads stubbed out."""
+    def questions(job_desc, n):
+        for i in range(3):
+            answer = Future()
+            answer.set_result(f"model answer {i}")
+            yield f"Q{i}?", answer
+
+    def transcribe(path):
+        if "q2_" in path:
+            raise RuntimeError("whisper died")
+        return f"answer from {path}"
+
+    monkeypatch.setattr(mock_interview, "answer_output_dir", str(tmp_path))
+    monkeypatch.setattr(mock_interview, "stream_questions_and_answers", questions)
+    monkeypatch.setattr(mock_interview, "speak", lambda q: None)
+    monkeypatch.setattr(mock_interview, "record_av_until_silence", lambda base: (base + "_audio.wav", base + "_video.avi", None))
+    monkeypatch.setattr(mock_interview, "transcribe_audio_whisper", transcribe)
+    monkeypatch.setattr(mock_interview, "analyze_video", lambda path: {"confidence_score": 0.5})
+    monkeypatch.setattr(mock_interview, "analyze_audio", lambda path, samples: {"average_energy": 0.5})
+    monkeypatch.setattr(mock_interview, "upload_to_cloudinary", lambda path: "https://cdn/" + path)
+    monkeypatch.setattr(mock_interview, "compute_answer_similarity", lambda a, b: 0.8)
+    yield tmp_path
+    mock_interview.shutdown_pools()
+
+
+def test_importing_starts_no_pools():
+    mock_interview.shutdown_pools()
+    assert mock_interview._pools == {}
+    assert not any(t.name.startswith("interview-") for t in threading.enumerate() if t.is_alive())
+
+
+def test_failed_transcription_is_recorded_and_the_interview_continues(interview):
+    out = mock_interview.run_mock_interview("Python developer")
+
+    results = out["qa_results"]
+    assert [r["question"] for r in results] == ["Q0?", "Q1?", "Q2?"]
+    assert results[1]["candidate_answer"] == "" and results[1]["errors"] == {"transcript": "whisper died"}
+    assert results[1]["similarity_score"] == 0.0
+    assert "errors" not in results[0] and results[2]["similarity_score"] == 0.8
+
+    partial = json.loads((interview / "qa_results_partial.json").read_text())
+    assert [r["question"] for r in partial] == ["Q0?", "Q1?", "Q2?"]
+    assert json.loads((interview / "qa_results.json").read_text())["qa_results"] == json.loads(json.dumps(results))
+
+
+def test_parser_leaves_a_split_item_for_the_next_chunk():
+    buffer = 'Here you go:\n["What is a closure?", "Explain the G'
+    questions, offset = mock_interview.parse_streamed_questions(buffer)
+    assert questions == ["What is a closure?"]
+
+    buffer += 'IL?", "Why asyncio?"]'
+    assert mock_interview.parse_streamed_questions(buffer, offset) == (["Explain the GIL?", "Why asyncio?"], None)
+
+
+def test_parser_handles_escaped_and_mixed_quotes():
+    buffer = r'''["Say \"hello\" in Python?", 'What\'s a generator?', "It's a \\ test?"]'''
+    questions, offset = mock_interview.parse_streamed_questions(buffer)
+    assert questions == ['Say "hello" in Python?', "What's a generator?", "It's a \\ test?"]
+    assert offset is None
+
+
+def test_parser_ignores_text_after_the_closing_bracket():
+    buffer = '["Q1?"]\nNote: "this is not a question", ["nor this"]'
+    assert mock_interview.parse_streamed_questions(buffer) == (["Q1?"], None)
+
+
+def test_stream_questions_stops_reading_at_the_closing_bracket(monkeypatch):
+    read = []
+
+    class Chunk:
+        def __init__(self, content):
+            self.content = content
+
+    class StreamingLLM:
+        def stream(self, messages):
+            for piece in ['["Fir', 'st?", "Sec', 'ond?"]', ' trailing "junk"', " more"]:
+                read.append(piece)
+                yield Chunk(piece)
+
+    monkeypatch.setattr(mock_interview, "llm", StreamingLLM())
+    assert list(mock_interview.stream_questions("jd", 5)) == ["First?", "Second?"]
+    assert len(read) == 3
+
+
+def test_prefetch_starts_every_answer_before_the_first_recording(monkeypatch):
+    started = []
+
+    def questions(job_desc, n):
+        for i in range(n):
+            started.append(i)
+            answer = Future()
+            answer.set_result(i)
+            yield f"Q{i}?", answer
+
+    monkeypatch.setattr(mock_interview, "stream_questions_and_answers", questions)
+    pairs = mock_interview.prefetch_questions_and_answers("jd", 4)
+    first, _ = next(pairs)  # the caller now "records" for minutes before asking for the next one
+    for _ in range(100):
+        if len(started) == 4:
+            break
+        threading.Event().wait(0.01)
+    assert first == "Q0?" and started == [0, 1, 2, 3]
+    assert [q for q, _ in pairs] == ["Q1?", "Q2?", "Q3?"]
+
+
+def test_prefetch_reraises_a_stream_error(monkeypatch):
+    def questions(job_desc, n):
+        yield "Q0?", Future()
+        raise RuntimeError("stream broke")
+
+    monkeypatch.setattr(mock_interview, "stream_questions_and_answers", questions)
+    pairs = mock_interview.prefetch_questions_and_answers("jd", 3)
+    assert next(pairs)[0] == "Q0?"
+    with pytest.raises(RuntimeError, match="stream broke"):
+        next(pairs)
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+from huggingface_hub import try_to_load_from_cache
+
+from Utils.onnx_encoder import HF_MODEL_NAME, export_minilm, parity_check
+
+SAMPLES = [
+    "Senior Python developer with FastAPI and PostgreSQL experience",
+    "The interview process was smooth and the recruiter was helpful.",
+    "short",
+    "Responsible for designing, building and maintaining scalable microservices " * 10,
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    # Without cached weights the hub lookup retries for minutes offline, so downloading is opt-in
+    if not os.getenv("ONNX_PARITY") and not isinstance(try_to_load_from_cache(HF_MODEL_NAME, "config.json"), str):
+        pytest.skip(f"{HF_MODEL_NAME} is not cached locally; set ONNX_PARITY=1 to download it")
+    try:
+        sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:  # no network and no local copy of the weights
+        pytest.skip(f"all-MiniLM-L6-v2 weights unavailable: {e}")
+    directory = str(tmp_path_factory.mktemp("onnx"))
+    export_minilm(directory, quantize=True)
+    return directory
+
+
+def test_fp32_export_matches_sentence_transformers(model_dir):
+    assert parity_check(SAMPLES, quantized=False, model_dir=model_dir)["min_cosine"] > 0.9999
+
+
+def test_int8_export_stays_close(model_dir):
+    assert parity_check(SAMPLES, quantized=True, model_dir=model_dir)["min_cosine"] > 0.98
@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app as backend
+from Feedback import sentiment
+from Utils.executors import BoundedPool
+
+# Bag-of-words stand-in for MiniLM: one axis per sentiment, plus a constant axis
+# so texts without any keyword still normalize
+KEYWORDS = {
+    0: {"positive", "great", "happy", "satisfied", "excellent", "helpful", "well", "love"},
+    1: {"negative", "terrible", "disappointed", "frustrated", "confusing", "slow", "failing", "nothing", "not"},
+    2: {"neutral", "okay", "opinion", "fine", "average", "does"},
+}
+
+
+class StubEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), 4), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = {w.strip(".,!?").lower() for w in text.split()}
+            for axis, keywords in KEYWORDS.items():
+                vectors[row, axis] = len(words & keywords)
+            vectors[row, 3] = 0.5
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+FEEDBACKS = [
+    "Great tool, I love it and the hints were really helpful!",
+    "Terrible. Slow, confusing and the upload kept failing.",
+    "It was okay, average questions.",
+    "Excellent mock interview, very happy.",
+    "I am disappointed, nothing worked.",
+]
+EXPECTED = ["positive", "negative", "neutral", "positive", "negative"]
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    stub = StubEncoder()
+    monkeypatch.setattr(sentiment, "get_model", lambda: stub)
+    sentiment.get_label_matrix.cache_clear()
+    yield stub
+    sentiment.get_label_matrix.cache_clear()
+
+
+@pytest.fixture
+def client(encoder, monkeypatch):
+    # Threads, so the workers see the stubbed encoder
+    pool = BoundedPool("cpu-test", kind="thread", max_workers=2, max_queue=8)
+    monkeypatch.setattr(backend, "cpu_pool", pool)
+    yield TestClient(backend.app)
+    pool.shutdown()
+
+
+def test_batch_labels_and_confidences(encoder):
+    results = sentiment.analyze_feedback_batch(FEEDBACKS)
+
+    assert [r["label"] for r in results] == EXPECTED
+    assert [r["sentiment_score"] for r in results] == [1, -1, 0, 1, -1]
+    for result in results:
+        assert set(result["confidences"]) == set(sentiment.sentiment_labels)
+        assert sum(result["confidences"].values()) == pytest.approx(1.0, abs=1e-3)
+        assert max(result["confidences"], key=result["confidences"].get) == result["label"]
+
+
+def test_batch_encodes_once_and_empty_input_encodes_nothing(encoder):
+    assert sentiment.analyze_feedback_batch([]) == []
+    assert encoder.calls == []
+
+    sentiment.analyze_feedback_batch(FEEDBACKS)
+    # One call for the label prototypes, one for the whole batch
+    assert sorted(len(c) for c in encoder.calls) == [len(FEEDBACKS), 15]
+
+
+def test_single_and_batch_agree(encoder):
+    batch = sentiment.analyze_feedback_batch(FEEDBACKS)
+    for text, result in zip(FEEDBACKS, batch):
+        assert sentiment.analyze_feedback(text) == result["sentiment_score"]
+        assert sentiment.analyze_feedback_batch([text]) == [result]
+
+
+def test_batch_endpoint(client):
+    response = client.post("/analyze-feedback/batch", json={"feedbacks": FEEDBACKS})
+    assert response.status_code == 200
+    assert response.json() == {"results": sentiment.analyze_feedback_batch(FEEDBACKS)}
+
+
+def test_stream_endpoint_matches_batch(client, monkeypatch):
+    monkeypatch.setattr(backend, "SENTIMENT_CHUNK_SIZE", 2)
+    batch = client.post("/analyze-feedback/batch", json={"feedbacks": FEEDBACKS}).json()["results"]
+
+    response = client.post("/analyze-feedback/batch", json={"feedbacks": FEEDBACKS, "stream": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.pop("index") for line in lines] == list(range(len(FEEDBACKS)))
+    assert lines == batch
+
+
+def test_single_endpoint_matches_batch_endpoint(client):
+    batch = client.post("/analyze-feedback/batch", json={"feedbacks": FEEDBACKS}).json()["results"]
+    for text, result in zip(FEEDBACKS, batch):
+        single = client.post("/analyze-feedback/", json={"feedback": text}).json()
+        assert single == {"feedback": text, "sentiment_score": result["sentiment_score"]}
+
+
+def test_batch_endpoint_rejects_too_many_texts(client, monkeypatch):
+    monkeypatch.setattr(backend, "SENTIMENT_MAX_TEXTS", 3)
+    response = client.post("/analyze-feedback/batch", json={"feedbacks": FEEDBACKS})
+    assert response.status_code == 413
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from Utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_share_a_single_upstream_call():
+    calls = []
+
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch(key):
+            calls.append(key)
+            await release.wait()
+            return f"value-{key}"
+
+        waiters = [asyncio.ensure_future(flight.do("k", lambda: fetch("k"))) for _ in range(5)]
+        other = asyncio.ensure_future(flight.do("other", lambda: fetch("other")))
+        await asyncio.sleep(0)
+        assert flight.is_in_flight("k")
+        release.set()
+        results = await asyncio.gather(*waiters, other)
+        await asyncio.sleep(0)
+        return results, flight
+
+    results, flight = asyncio.run(main())
+    assert results == ["value-k"] * 5 + ["value-other"]
+    assert sorted(calls) == ["k", "other"]
+    assert flight.stats() == {"upstream_calls": 2, "coalesced": 4, "in_flight": 0}
+
+
+def test_error_reaches_every_waiter_and_the_key_is_released():
+    attempts = []
+
+    async def main():
+        flight = SingleFlight()
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        await asyncio.sleep(0)
+        assert not flight.is_in_flight("k")
+
+        async def ok():
+            return "recovered"
+
+        return results, await flight.do("k", ok)
+
+    results, recovered = asyncio.run(main())
+    assert len(attempts) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert recovered == "recovered"
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def main():
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
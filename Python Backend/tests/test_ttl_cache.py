@@ -0,0 +1,50 @@
+from Utils import ttl_cache
+from Utils.ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock)
+    cache = TTLCache(max_entries=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+
+    clock.now += 4.9
+    assert cache.get("a") == (True, 1)
+    clock.now += 0.2
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 1
+
+
+def test_no_ttl_never_expires_and_falsy_values_are_hits(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock)
+    cache = TTLCache(max_entries=10)
+    cache.set("empty", [])
+    cache.set("none", None)
+    clock.now += 10 ** 6
+    assert cache.get("empty") == (True, [])
+    assert cache.get("none") == (True, None)
+    assert cache.get("missing") == (False, None)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as backend
+
+ORIGIN = {"Origin": "http://frontend.example"}
+LIMIT = backend.MAX_UPLOAD_BYTES + backend.MULTIPART_OVERHEAD_BYTES
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(backend.app)
+
+
+def assert_rejected(response):
+    assert response.status_code == 413
+    assert response.json() == {"detail": f"Request body exceeds {LIMIT} bytes"}
+    # UploadLimitMiddleware sits inside CORSMiddleware, so browsers can read the 413
+    assert response.headers.get("access-control-allow-origin") == ORIGIN["Origin"]
+
+
+def test_rejects_by_content_length(client):
+    body = b"x" * (LIMIT + 1)
+    response = client.post("/parse-resume/", files={"file": ("resume.pdf", body)}, headers=ORIGIN)
+    assert_rejected(response)
+
+
+def test_rejects_chunked_body_once_it_crosses_the_limit(client):
+    def chunks():
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="resume.pdf"\r\n\r\n'
+        for _ in range(LIMIT // (1 << 20) + 2):
+            yield b"x" * (1 << 20)
+        yield b"\r\n--b--\r\n"
+
+    response = client.post(
+        "/parse-resume/", content=chunks(),
+        headers={**ORIGIN, "Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert "content-length" not in response.request.headers
+    assert_rejected(response)
+
+
+def test_small_uploads_reach_the_endpoint(client):
+    response = client.post("/parse-resume/", files={"file": ("resume.txt", b"hello")}, headers=ORIGIN)
+    # The endpoint's own validation answers, not the middleware
+    assert response.status_code == 400
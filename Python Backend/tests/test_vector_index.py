@@ -0,0 +1,85 @@
+import zlib
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from Utils.vector_index import VectorIndex
+
+DIM = 16
+
+
+def vector_for(item_id: str) -> np.ndarray:
+    return np.random.default_rng(zlib.crc32(item_id.encode())).standard_normal(DIM).astype(np.float32)
+
+
+def upsert_ids(directory: str, worker: int, count: int):
+    index = VectorIndex(directory, dim=DIM)
+    for start in range(0, count, 5):
+        ids = [f"w{worker}-{i}" for i in range(start, start + 5)]
+        index.upsert((i, vector_for(i)) for i in ids)
+
+
+def best_match(index: VectorIndex, item_id: str):
+    return index.search(vector_for(item_id), k=1)[0]
+
+
+def test_search_survives_reload_with_updates_and_deletes(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=DIM)
+    index.upsert((f"id{i}", vector_for(f"id{i}")) for i in range(50))
+    index.upsert([("id3", vector_for("moved"))])
+    assert index.delete(["id7", "id7", "unknown"]) == 1
+
+    reloaded = VectorIndex(str(tmp_path), dim=DIM)
+    assert len(reloaded) == 49
+    assert best_match(reloaded, "id10")[0] == "id10"
+    assert best_match(reloaded, "moved")[0] == "id3"
+    assert all(item_id != "id7" for item_id, _ in reloaded.search(vector_for("id7"), k=49))
+    assert best_match(reloaded, "id10")[1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_other_instances_see_writes_and_compaction(tmp_path):
+    writer = VectorIndex(str(tmp_path), dim=DIM)
+    reader = VectorIndex(str(tmp_path), dim=DIM)
+    writer.upsert((f"id{i}", vector_for(f"id{i}")) for i in range(1200))
+    assert best_match(reader, "id5")[0] == "id5"
+
+    writer.delete(f"id{i}" for i in range(400))  # below 75% live rows: compacts to a new generation
+    assert writer.stats()["generation"] == 1
+    assert len(reader.search(vector_for("id5"), k=1200)) == 800
+    assert reader.stats()["generation"] == 1
+    assert best_match(reader, "id900")[0] == "id900"
+
+
+def test_concurrent_writer_processes_keep_ids_aligned(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=upsert_ids, args=(str(tmp_path), w, 50)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    index = VectorIndex(str(tmp_path), dim=DIM)
+    assert len(index) == 200
+    for item_id in index.row_of:
+        assert best_match(index, item_id) == (item_id, pytest.approx(1.0, abs=1e-5))
+
+
+def test_ivf_search_finds_exact_matches(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=DIM, ann_threshold=500, nprobe=4)
+    index.upsert((f"id{i}", vector_for(f"id{i}")) for i in range(2000))
+    assert index.search(vector_for("id1"), k=1)[0][0] == "id1"  # exact while the IVF builds
+    index.build_ann(wait=True)
+    assert index.stats()["ann"]
+    hits = sum(best_match(index, f"id{i}")[0] == f"id{i}" for i in range(0, 2000, 20))
+    assert hits == 100
+
+
+def test_invalid_queries_are_rejected(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=DIM)
+    assert index.search(vector_for("a"), k=3) == []
+    with pytest.raises(ValueError):
+        index.search(vector_for("a"), k=0)
+    with pytest.raises(ValueError):
+        index.upsert([("a", [1.0, 2.0])])